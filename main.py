@@ -1,3 +1,15 @@
+import argparse
+
 import src.generate as generate
 
-generate.generate_source_code('examples/pss_api_ios_v0.989.9402.json', 'bin')
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generates a python package for the PSS API from a structure JSON file.')
+    parser.add_argument('data_file', nargs='?', default='examples/pss_api_ios_v0.989.9402.json', help='Structure JSON file created by parse.py.')
+    parser.add_argument('target_path', nargs='?', default='bin', help='Directory to generate the package into.')
+    parser.add_argument('--mock-server', action='store_true', help='Additionally generate a mock server and a load driver into the subpackage \'mock\'.')
+    args = parser.parse_args()
+
+    generate.generate_source_code(args.data_file, args.target_path)
+    if args.mock_server:
+        generate.generate_mock_server(args.data_file, args.target_path)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import gc
+import importlib
+import inspect
+import json
+import os
+import math
+import pkgutil
+import statistics
+import sys
+from timeit import default_timer as timer
+import tracemalloc
+from types import ModuleType
+from typing import Callable, Dict, List, Set, Tuple
+from xml.etree import ElementTree
+
+from parse import collect_flows_file_paths, read_response_bodies, read_structure_json
+from utils import read_json
+
+
+# ----- Constants and type definitions -----
+
+BenchmarkResults = Dict[str, Dict[str, float]]
+ReplayCall = Tuple[Callable, Dict[str, None], bytes]
+
+DEFAULT_MAX_REGRESSION: float = 0.1
+DEFAULT_MIN_RUN_SECONDS: float = 0.2
+DEFAULT_REPEAT: int = 7
+
+# A timing regression must exceed this multiple of the combined relative noise of both runs to count
+NOISE_FACTOR: float = 3.0
+
+# Metric name: name of the metric holding its relative noise or None. Lower values are better.
+# Absolute throughput depends on the machine's state at the time of the run, so timings get compared
+# relative to parsing the same bodies with ElementTree only.
+REGRESSION_METRICS: Dict[str, str] = {
+    'peak_bytes_per_call': None,
+    'relative_cost': 'relative_cost_noise',
+}
+
+
+
+
+
+# ----- Public Functions -----
+
+def compare_benchmark_results(results: BenchmarkResults, baseline: BenchmarkResults, max_regression: float = DEFAULT_MAX_REGRESSION) -> List[str]:
+    """
+    Returns a description of every endpoint metric, that got worse than the baseline by more than max_regression (relative).
+    For timings, the allowed regression grows to NOISE_FACTOR times the combined noise measured in both runs, if that is larger.
+    """
+    result: List[str] = []
+    for path in sorted(set(results.keys()).intersection(baseline.keys())):
+        for metric, noise_metric in REGRESSION_METRICS.items():
+            value = results[path].get(metric)
+            baseline_value = baseline[path].get(metric)
+            if not value or not baseline_value:
+                continue
+            allowed_regression = max_regression
+            if noise_metric:
+                allowed_regression = max(max_regression, NOISE_FACTOR * (results[path][noise_metric] + baseline[path][noise_metric]))
+            change = (value - baseline_value) / baseline_value
+            if change > allowed_regression:
+                result.append(f'{path}: {metric} {baseline_value:.2f} -> {value:.2f} ({change:+.1%}, allowed: {allowed_regression:.1%})')
+    return result
+
+
+def get_raw_service_functions(package: ModuleType) -> Dict[str, Callable]:
+    """
+    Maps the path of every endpoint of the generated package (e.g. 'ItemService/ListItemDesigns2') to its raw service function.
+    """
+    raw_services = importlib.import_module(f'{package.__name__}.services.raw')
+    result: Dict[str, Callable] = {}
+    for module_info in pkgutil.iter_modules(raw_services.__path__):
+        module = importlib.import_module(f'{raw_services.__name__}.{module_info.name}')
+        for name, value in vars(module).items():
+            if name.endswith('_BASE_PATH') and isinstance(value, str):
+                function = getattr(module, name[:-len('_BASE_PATH')].lower(), None)
+                if function:
+                    result[value] = function
+    return result
+
+
+def load_generated_package(package_path: str) -> ModuleType:
+    package_path = os.path.abspath(package_path.rstrip('/\\'))
+    if not os.path.isfile(os.path.join(package_path, '__init__.py')):
+        raise FileNotFoundError(f'The specified path is not a python package: {package_path}')
+    parent_path, package_name = os.path.split(package_path)
+    if parent_path not in sys.path:
+        sys.path.insert(0, parent_path)
+    return importlib.import_module(package_name)
+
+
+def run_load_benchmark(file_paths: List[str], repeat: int = DEFAULT_REPEAT) -> BenchmarkResults:
+    """
+    Compares the time it takes to load structure JSON files with and without the marshal cache. The durations are the best of 'repeat' runs.
+    """
+    result: BenchmarkResults = {}
+    for file_path in file_paths:
+        read_json(file_path) # Creates or refreshes the cache
+        result[file_path] = {
+            'cache_seconds': __measure_best_duration(lambda: read_json(file_path), repeat),
+            'json_seconds': __measure_best_duration(lambda: read_json(file_path, use_cache=False), repeat),
+            'structure_cache_seconds': __measure_best_duration(lambda: read_structure_json(file_path), repeat),
+            'structure_json_seconds': __measure_best_duration(lambda: read_structure_json(file_path, use_cache=False), repeat),
+        }
+    return result
+
+
+def run_replay_benchmark(package: ModuleType, response_bodies: List[Tuple[str, str, bytes]], repeat: int = DEFAULT_REPEAT, min_run_seconds: float = DEFAULT_MIN_RUN_SECONDS) -> BenchmarkResults:
+    """
+    Feeds the captured response bodies to the raw service functions of the generated package instead of requesting them
+    from a server, so that only parsing and entity creation get measured. Returns the results per endpoint path.
+
+    Request coalescing, metrics and parse offloading are disabled for the run. Each timed run replays the bodies of an
+    endpoint as often as needed to take at least min_run_seconds, with garbage collection disabled. Throughput is taken from
+    the best of 'repeat' runs. Each run alternates with parsing the same bodies with ElementTree only: the median ratio is
+    reported as 'relative_cost' and its median absolute deviation as 'relative_cost_noise'. Allocations are measured with
+    tracemalloc in a separate run.
+    """
+    metrics = importlib.import_module(f'{package.__name__}.metrics')
+    pipeline = importlib.import_module(f'{package.__name__}.pipeline')
+    singleflight = importlib.import_module(f'{package.__name__}.singleflight')
+
+    replay_calls = __get_replay_calls(get_raw_service_functions(package), response_bodies)
+    replayed_data = {'body': b''}
+
+    async def get_replayed_data(production_server: str, path: str, **params) -> bytes:
+        return replayed_data['body']
+
+    async def replay(calls: List[ReplayCall]) -> int:
+        entity_count = 0
+        for function, kwargs, body in calls:
+            replayed_data['body'] = body
+            entity_count += len(await function('replay', **kwargs))
+        return entity_count
+
+    async def measure_durations(calls: List[ReplayCall]) -> Tuple[int, int, List[float], List[float]]:
+        loops = 1
+        while True:
+            start = timer()
+            for _ in range(loops):
+                entity_count = await replay(calls)
+            duration = timer() - start
+            if duration >= min_run_seconds:
+                break
+            loops = max(loops * 2, math.ceil(loops * min_run_seconds / max(duration, 1e-9)))
+        durations = []
+        reference_durations = []
+        for _ in range(repeat):
+            # Alternate with the reference, so that both see the same machine state
+            start = timer()
+            for _ in range(loops):
+                __parse_reference(calls)
+            reference_durations.append((timer() - start) / loops)
+            start = timer()
+            for _ in range(loops):
+                await replay(calls)
+            durations.append((timer() - start) / loops)
+        return entity_count, loops, durations, reference_durations
+
+    async def measure_allocations(calls: List[ReplayCall]) -> Tuple[int, int]:
+        peak_bytes = 0
+        retained_bytes = 0
+        for function, kwargs, body in calls:
+            replayed_data['body'] = body
+            start_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            entities = await function('replay', **kwargs)
+            end_bytes, call_peak_bytes = tracemalloc.get_traced_memory()
+            peak_bytes += call_peak_bytes - start_bytes
+            retained_bytes += end_bytes - start_bytes
+            del entities
+        return peak_bytes, retained_bytes
+
+    async def run() -> BenchmarkResults:
+        result: BenchmarkResults = {}
+        for path, calls in replay_calls.items():
+            gc.collect()
+            gc.disable()
+            try:
+                entity_count, loops, durations, reference_durations = await measure_durations(calls)
+            finally:
+                gc.enable()
+            tracemalloc.start()
+            try:
+                peak_bytes, retained_bytes = await measure_allocations(calls)
+            finally:
+                tracemalloc.stop()
+            result[path] = __create_endpoint_result(calls, entity_count, durations, reference_durations, loops, peak_bytes, retained_bytes)
+        return result
+
+    original_get_data_from_path = pipeline.get_data_from_path
+    original_parse_offload_threshold = pipeline.PARSE_OFFLOAD_THRESHOLD
+    original_coalescing_enabled = singleflight.REQUESTS.enabled
+    original_metrics_enabled = metrics.ENABLED
+    pipeline.get_data_from_path = get_replayed_data
+    pipeline.set_parse_executor(None, None)
+    singleflight.REQUESTS.enabled = False
+    metrics.disable()
+    try:
+        result = asyncio.run(run())
+    finally:
+        pipeline.get_data_from_path = original_get_data_from_path
+        pipeline.set_parse_executor(None, original_parse_offload_threshold)
+        singleflight.REQUESTS.enabled = original_coalescing_enabled
+        if original_metrics_enabled:
+            metrics.enable()
+    return result
+
+
+def print_load_benchmark_results(results: BenchmarkResults) -> None:
+    print(f'{"File":<60} {"JSON ms":>9} {"Cache ms":>9} {"Speedup":>8} {"Structure JSON ms":>18} {"Structure cache ms":>19}')
+    for file_path in sorted(results.keys()):
+        file_result = results[file_path]
+        speedup = file_result['json_seconds'] / file_result['cache_seconds'] if file_result['cache_seconds'] else 0.0
+        print(f'{file_path:<60} {file_result["json_seconds"] * 1000:>9.2f} {file_result["cache_seconds"] * 1000:>9.2f} {speedup:>7.1f}x {file_result["structure_json_seconds"] * 1000:>18.2f} {file_result["structure_cache_seconds"] * 1000:>19.2f}')
+
+
+def print_benchmark_results(results: BenchmarkResults) -> None:
+    print(f'{"Endpoint":<60} {"Calls":>6} {"Entities":>9} {"MiB/s":>8} {"Entities/s":>11} {"Cost x ET":>10} {"Noise":>7} {"Peak KiB/call":>14} {"Bytes/entity":>13}')
+    for path in sorted(results.keys()):
+        endpoint_result = results[path]
+        print(f'{path:<60} {endpoint_result["calls"]:>6} {endpoint_result["entities"]:>9} {endpoint_result["megabytes_per_second"]:>8.2f} {endpoint_result["entities_per_second"]:>11.0f} {endpoint_result["relative_cost"]:>10.2f} {endpoint_result["relative_cost_noise"]:>7.1%} {endpoint_result["peak_bytes_per_call"] / 1024:>14.1f} {endpoint_result["retained_bytes_per_entity"]:>13.1f}')
+    total_entities = sum(endpoint_result['entities'] for endpoint_result in results.values())
+    total_seconds = sum(endpoint_result['seconds'] for endpoint_result in results.values())
+    if total_seconds:
+        print(f'Total: {total_entities} entities in {total_seconds:.3f}s ({total_entities / total_seconds:.0f} entities/s)')
+
+
+
+
+
+# ----- Private Functions -----
+
+def __create_endpoint_result(calls: List[ReplayCall], entity_count: int, durations: List[float], reference_durations: List[float], loops: int, peak_bytes: int, retained_bytes: int) -> Dict[str, float]:
+    call_count = len(calls)
+    byte_count = sum(len(body) for _, _, body in calls)
+    seconds = min(durations)
+    relative_costs = [duration / reference_duration for duration, reference_duration in zip(durations, reference_durations)]
+    relative_cost = statistics.median(relative_costs)
+    return {
+        'bytes': byte_count,
+        'calls': call_count,
+        'entities': entity_count,
+        'entities_per_second': entity_count / seconds if seconds else 0.0,
+        'loops': loops,
+        'megabytes_per_second': byte_count / 1024 / 1024 / seconds if seconds else 0.0,
+        'peak_bytes_per_call': peak_bytes / call_count,
+        'relative_cost': relative_cost,
+        'relative_cost_noise': statistics.median(abs(cost - relative_cost) for cost in relative_costs) / relative_cost,
+        'retained_bytes_per_entity': retained_bytes / entity_count if entity_count else 0.0,
+        'seconds': seconds,
+    }
+
+
+def __get_replay_calls(functions: Dict[str, Callable], response_bodies: List[Tuple[str, str, bytes]]) -> Dict[str, List[ReplayCall]]:
+    result: Dict[str, List[ReplayCall]] = {}
+    skipped_paths: Set[str] = set()
+    for service, endpoint, body in response_bodies:
+        path = f'{service}/{endpoint}'
+        function = functions.get(path)
+        if function is None:
+            skipped_paths.add(path)
+            continue
+        # The parameters only end up in the request, which gets replayed, so their values don't matter.
+        kwargs = {
+            parameter.name: None for parameter in list(inspect.signature(function).parameters.values())[1:]
+            if parameter.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD
+        }
+        result.setdefault(path, []).append((function, kwargs, body))
+    if skipped_paths:
+        print(f'Skipped responses of {len(skipped_paths)} endpoint(s) unknown to the generated package: {", ".join(sorted(skipped_paths))}')
+    return result
+
+
+def __measure_best_duration(function: Callable, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = timer()
+        function()
+        durations.append(timer() - start)
+    return min(durations)
+
+
+def __parse_reference(calls: List[ReplayCall]) -> None:
+    for _, _, body in calls:
+        ElementTree.fromstring(body)
+
+
+def __read_response_bodies(file_paths: List[str], endpoint_filter: str = None) -> List[Tuple[str, str, bytes]]:
+    result: List[Tuple[str, str, bytes]] = []
+    for file_path in collect_flows_file_paths(file_paths):
+        result.extend(
+            response_body for response_body in read_response_bodies(file_path)
+            if not endpoint_filter or endpoint_filter in f'{response_body[0]}/{response_body[1]}'
+        )
+    return result
+
+
+
+
+
+# ----- MAIN -----
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks the code generated from a PSS API structure.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help='Compare loading structure JSON files with and without the marshal cache.')
+    load_parser.add_argument('paths', nargs='+', help='Structure JSON files.')
+    load_parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Number of timed runs per file. The best run counts.')
+
+    replay_parser = subparsers.add_parser('replay', help='Replay response bodies from flows files through the generated raw services.')
+    replay_parser.add_argument('package', help='Path to the generated package.')
+    replay_parser.add_argument('paths', nargs='+', help='Flows files, directories containing flows files or glob patterns.')
+    replay_parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Number of timed runs per endpoint. The best run counts.')
+    replay_parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_RUN_SECONDS, help='Minimum duration of a timed run in seconds. The bodies get replayed as often as needed.')
+    replay_parser.add_argument('-e', '--endpoint', default=None, help='Only replay endpoints whose path contains this text.')
+    replay_parser.add_argument('-o', '--output', default=None, help='Store the results as JSON at this path, e.g. to be used as a baseline.')
+    replay_parser.add_argument('-b', '--baseline', default=None, help='Compare the results with those stored at this path and exit with code 1 on regressions.')
+    replay_parser.add_argument('--max-regression', type=float, default=DEFAULT_MAX_REGRESSION, help='Allowed relative regression per endpoint against the baseline. Timings allow more, if the measured noise is higher.')
+
+    args = parser.parse_args()
+
+    if args.command == 'load':
+        print_load_benchmark_results(run_load_benchmark(args.paths, args.repeat))
+
+    elif args.command == 'replay':
+        start = timer()
+        response_bodies = __read_response_bodies(args.paths, args.endpoint)
+        print(f'Read {len(response_bodies)} response bodies in {timer() - start:.3f}s')
+        if not response_bodies:
+            raise ValueError('No response bodies found in the specified flows files!')
+
+        results = run_replay_benchmark(load_generated_package(args.package), response_bodies, args.repeat, args.min_time)
+        print_benchmark_results(results)
+
+        if args.output:
+            with open(args.output, 'w') as fp:
+                json.dump(results, fp, indent=2)
+            print(f'Stored benchmark results at: {args.output}')
+
+        if args.baseline:
+            with open(args.baseline, 'r') as fp:
+                baseline = json.load(fp)
+            regressions = compare_benchmark_results(results, baseline, args.max_regression)
+            if regressions:
+                print(f'{len(regressions)} regression(s) against baseline {args.baseline}:')
+                for regression in regressions:
+                    print(f'  {regression}')
+                sys.exit(1)
+            print(f'No regressions against baseline: {args.baseline}')
@@ -51,12 +51,32 @@ PARSER_FUNCTIONS = {
     'int': 'pss_int'
 }
 
+# Names of TableBase members, which must not be overridden by generated column accessors
+TABLE_RESERVED_NAMES = {
+    'column_data',
+    'column_names',
+    'filter',
+    'from_entities',
+    'from_entity_infos',
+    'from_xml',
+    'head',
+    'select',
+    'sort',
+    'to_dicts',
+}
+
+SAMPLE_PARAMETER_VALUES = {
+    'bool': 'True',
+    'datetime': '_datetime(2021, 1, 1)',
+    'float': '1.0',
+    'int': '1',
+    'str': "'mock'",
+}
 
 
-def read_data(file_path: str) -> dict:
-    result = None
-    with open(file_path) as f:
-        result = _json.load(f)
+
+def read_data(file_path: str, use_cache: bool = True) -> dict:
+    result = _utils.read_json(file_path, use_cache=use_cache)
     return result
 
 
@@ -131,6 +151,41 @@ def __prepare_entity_data(entities_data: dict) -> list:
     return result
 
 
+def __prepare_design_data(services: list, entities: list) -> list:
+    """ Design endpoints are those taking a parameter 'designVersion'. Only the first endpoint
+        returning a specific entity type will be considered. The id property of an entity type is
+        '<entity name>Id' or 'Id', the foreign keys are all other int properties ending with 'Id'."""
+    entities_by_name = {entity['name']: entity for entity in entities}
+    result = []
+    for service in services:
+        for endpoint in service['endpoints']:
+            entity = entities_by_name.get(endpoint['return_type'])
+            if not entity or entity['name'] in (design['entity_name'] for design in result):
+                continue
+            if 'designVersion' not in (parameter['name'] for parameter in endpoint['parameters']):
+                continue
+
+            id_properties = [property for property in entity['properties'] if property['type'] == 'int' and property['name'].endswith('Id')]
+            if not id_properties:
+                continue
+            id_property = next(
+                (property for property in id_properties if property['name'] in (f'{entity["name"]}Id', 'Id')),
+                id_properties[0]
+            )
+
+            result.append({
+                'entity_name': entity['name'],
+                'entity_name_snake_case': entity['name_snake_case'],
+                'foreign_keys': [property['name_snake_case'] for property in id_properties if property is not id_property],
+                'function_name': endpoint['name_snake_case'],
+                'id_property': id_property['name_snake_case'],
+                'parameter_names': [parameter['name_snake_case'] for parameter in endpoint['parameters'] if parameter['type']],
+                'service_name': service['name'],
+            })
+    result.sort(key=lambda d: d['entity_name'])
+    return result
+
+
 def __get_return_type(response_structure: dict, entity_names: _List[str], parent_tag_name: str = None) -> _Tuple[str, str]:
     """ The return type will be determined by crawling through dict 'response_structure' until there's
         a match of tag name and any known entity_name. All matching tag names on that depth will
@@ -172,6 +227,9 @@ def generate_files_from_data(data: dict, target_path: str) -> None:
     services = data[0]
 
     client_template = env.get_template('client.py')
+    metrics_template = env.get_template('metrics.py')
+    pipeline_template = env.get_template('pipeline.py')
+    singleflight_template = env.get_template('singleflight.py')
     service_template = env.get_template('service.py')
     services_init_template = env.get_template('services_init.py')
     service_raw_template = env.get_template('service_raw.py')
@@ -208,6 +266,21 @@ def generate_files_from_data(data: dict, target_path: str) -> None:
         _os.path.join(target_path, 'client.py'),
         client_template.render(services=services),
     )
+    _utils.create_file(
+        _os.path.join(target_path, 'metrics.py'),
+        metrics_template.render(),
+        overwrite=True
+    )
+    _utils.create_file(
+        _os.path.join(target_path, 'pipeline.py'),
+        pipeline_template.render(),
+        overwrite=True
+    )
+    _utils.create_file(
+        _os.path.join(target_path, 'singleflight.py'),
+        singleflight_template.render(),
+        overwrite=True
+    )
 
     entities = data[1]
 
@@ -243,8 +316,116 @@ def generate_files_from_data(data: dict, target_path: str) -> None:
         overwrite=True
     )
 
+    designs = __prepare_design_data(services, entities)
+    design_repository_template = env.get_template('design_repository.py')
+
+    _utils.create_file(
+        _os.path.join(target_path, 'design_repository.py'),
+        design_repository_template.render(designs=designs, design_service_names=sorted({design['service_name'] for design in designs})),
+        overwrite=True
+    )
+
+    entity_table_template = env.get_template('entity_table.py')
+    table_base_template = env.get_template('table_base.py')
+    tables_init_template = env.get_template('tables_init.py')
+
+    tables_path = _os.path.join(target_path, 'tables')
+
+    _utils.create_path(tables_path)
+
+    _utils.create_file(
+        _os.path.join(tables_path, 'table_base.py'),
+        table_base_template.render(),
+        overwrite=True
+    )
+    for entity in entities:
+        _utils.create_file(
+            _os.path.join(tables_path, entity['name_snake_case'] + '_table.py'),
+            entity_table_template.render(entity=entity, reserved_names=TABLE_RESERVED_NAMES),
+            overwrite=True
+        )
+    _utils.create_file(
+        _os.path.join(tables_path, '__init__.py'),
+        tables_init_template.render(entities=entities),
+        overwrite=True
+    )
+
 
 def generate_source_code(data_file_path: str, target_path: str) -> None:
     data = read_data(data_file_path)
     prepared_data = prepare_data(data)
-    generate_files_from_data(prepared_data, target_path)
\ No newline at end of file
+    generate_files_from_data(prepared_data, target_path)
+
+
+def generate_mock_server_files_from_data(data: dict, prepared_data: tuple, target_path: str) -> None:
+    env = _Environment(
+        loader=_PackageLoader('src'),
+        trim_blocks=True
+    )
+
+    services = __prepare_mock_load_driver_data(prepared_data[0])
+    mock_schema = {
+        'endpoints': {
+            f'{service_name}/{endpoint_name}': {
+                'method': endpoint_definition['method'],
+                'response_structure': endpoint_definition['response_structure'],
+            }
+            for service_name, endpoints in data['endpoints'].items()
+            for endpoint_name, endpoint_definition in endpoints.items()
+        },
+        'entities': data['entities'],
+    }
+
+    mock_server_template = env.get_template('mock_server.py')
+    mock_load_driver_template = env.get_template('mock_load_driver.py')
+
+    mock_path = _os.path.join(target_path, 'mock')
+
+    _utils.create_path(target_path)
+    _utils.create_path(mock_path)
+
+    _utils.create_file(
+        _os.path.join(mock_path, '__init__.py'),
+        '',
+        overwrite=True
+    )
+    _utils.create_file(
+        _os.path.join(mock_path, 'schema.json'),
+        _json.dumps(mock_schema, indent=2),
+        overwrite=True
+    )
+    _utils.create_file(
+        _os.path.join(mock_path, 'server.py'),
+        mock_server_template.render(),
+        overwrite=True
+    )
+    _utils.create_file(
+        _os.path.join(mock_path, 'load_driver.py'),
+        mock_load_driver_template.render(services=services),
+        overwrite=True
+    )
+
+
+def generate_mock_server(data_file_path: str, target_path: str) -> None:
+    """
+    Generates a local mock server for all endpoints in the data file and a load driver running
+    the generated raw services against it into the subpackage 'mock' of target_path.
+    """
+    data = read_data(data_file_path)
+    prepared_data = prepare_data(data)
+    generate_mock_server_files_from_data(data, prepared_data, target_path)
+
+
+def __prepare_mock_load_driver_data(services: list) -> list:
+    result = []
+    for service in services:
+        endpoints = []
+        for endpoint in service['endpoints']:
+            parameters = [
+                dict(parameter, sample_value=SAMPLE_PARAMETER_VALUES.get(parameter['type'].lstrip('_'), 'None'))
+                for parameter in endpoint['parameters']
+                if parameter['type']
+            ]
+            endpoints.append(dict(endpoint, parameters=parameters))
+        result.append(dict(service, endpoints=endpoints))
+    return result
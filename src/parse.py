@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 
+import argparse
+from concurrent.futures import as_completed, ProcessPoolExecutor
 from datetime import datetime, timedelta
+import glob
 import json
+import os
 import os.path
 import sys
 from timeit import default_timer as timer
-from typing import Dict, List, Set, Tuple, Union
+from typing import Dict, Iterator, List, Set, Tuple, Union
 from xml.etree import ElementTree
 
 from mitmproxy.http import HTTPFlow
@@ -14,6 +18,8 @@ from mitmproxy.io import FlowReader, tnetstring
 
 from flowdetails import PssFlowDetails, ResponseStructure
 from objectstructure import PssObjectStructure
+from sketches import EndpointProfile, EndpointProfiles, EntityStatistics, merge_endpoint_profiles, merge_entity_statistics, PropertyStatistics
+from utils import read_json
 
 
 # ----- Constants and type definitions -----
@@ -22,6 +28,9 @@ ApiOrganizedFlows = Dict[str, Dict[str, Union[List[PssFlowDetails], List[PssObje
 ApiOrganizedFlowsDict = Dict[str, 'ApiOrganizedFlowsDict']
 NestedDict = Dict[str, Union[str, 'NestedDict']]
 
+# Files in directories will only be parsed, if they have one of these extensions
+FLOWS_FILE_EXTENSIONS: Tuple[str, ...] = ('.flow', '.flows', '.mitm')
+
 __TYPE_ORDER_LOOKUP: Dict[str, int] = {
     'float': 4,
     'int': 3,
@@ -36,28 +45,55 @@ __TYPE_ORDER_LOOKUP: Dict[str, int] = {
 
 # ----- Public Functions -----
 
+def collect_flows_file_paths(paths: List[str]) -> List[str]:
+    """
+    Expands glob patterns and directories to the flows files they contain. Only files with one of the FLOWS_FILE_EXTENSIONS will be taken from directories.
+    """
+    result: List[str] = []
+    for path in paths:
+        if glob.has_magic(path):
+            result.extend(sorted(file_path for file_path in glob.glob(path) if os.path.isfile(file_path)))
+        elif os.path.isdir(path):
+            result.extend(sorted(
+                file_path for file_path in (os.path.join(path, file_name) for file_name in os.listdir(path))
+                if os.path.isfile(file_path) and os.path.splitext(file_path)[1].lower() in FLOWS_FILE_EXTENSIONS
+            ))
+        else:
+            result.append(path)
+    return list(dict.fromkeys(result))
+
+
 def convert_organized_dicts_to_organized_flows(organized_dict: ApiOrganizedFlowsDict) -> ApiOrganizedFlows:
-    result: ApiOrganizedFlows = {}
-    for service, endpoints in organized_dict.items():
-        for endpoint, flow_dict in endpoints:
-            result.setdefault(service, {}).setdefault(endpoint, []).append(PssFlowDetails(flow_dict))
+    """
+    Converts the contents of a structure JSON file back to flow details and object structures.
+    Stored statistics are summaries that can't be merged anymore, so they'll be skipped.
+    """
+    result: ApiOrganizedFlows = {
+        'endpoints': {},
+        'entities': [PssObjectStructure(object_type_name, properties) for object_type_name, properties in organized_dict.get('entities', {}).items()],
+    }
+    for service, endpoints in organized_dict.get('endpoints', {}).items():
+        for endpoint, flow_dict in endpoints.items():
+            result['endpoints'].setdefault(service, {}).setdefault(endpoint, []).append(PssFlowDetails(flow_dict))
     return result
 
 
 def merge_organized_flows(flows1: ApiOrganizedFlows, flows2: ApiOrganizedFlows) -> ApiOrganizedFlows:
-    merged_flows: ApiOrganizedFlows = {}
-    for service1, endpoints1 in flows1.items():
-        if service1 in flows2:
-            for endpoint1, flow_details1 in endpoints1:
-                if endpoint1 in flows2[service1]:
-                    merged_flows.setdefault(service1, {}).setdefault(endpoint1, []).extend(flow_details1)
-                    merged_flows.setdefault(service1, {}).setdefault(endpoint1, []).extend(flows2[service1][endpoint1])
-                else:
-                    merged_flows.setdefault(service1, {})[endpoint1] = flows1
-        else:
-            merged_flows[service1] = endpoints1
+    flows: List[PssFlowDetails] = [
+        flow_details
+        for organized_flows in (flows1, flows2)
+        for endpoints in organized_flows['endpoints'].values()
+        for endpoint_flows in endpoints.values()
+        for flow_details in endpoint_flows
+    ]
+    object_structures: Dict[str, PssObjectStructure] = {}
+    for object_structure in flows1['entities'] + flows2['entities']:
+        object_structures[object_structure.object_type_name] = __merge_object_structures(object_structure, object_structures.get(object_structure.object_type_name))
 
-    result = __organize_flows(__singularize_flows(merged_flows))
+    result = {
+        'endpoints': __organize_flows(__singularize_flows(__organize_flows(flows))),
+        'entities': list(object_structures.values()),
+    }
     return result
 
 
@@ -76,15 +112,24 @@ def merge_structure_jsons(file_path1: str, file_path2: str) -> ApiOrganizedFlows
         raise Exception(f'Something fishy happened')
 
 
-def parse_flows_file(file_path: str, verbose: bool = False) -> ApiOrganizedFlows:
+def parse_flows_file(file_path: str, verbose: bool = False, collect_statistics: bool = False, collect_profile: bool = False) -> ApiOrganizedFlows:
     """
     Returns the path to the created json file
+
+    If collect_statistics is True, value statistics per entity property will be collected
+    in a fixed amount of memory per property and returned under the key 'statistics'.
+
+    If collect_profile is True, latency, request and response sizes and call frequency will
+    be aggregated per endpoint and returned under the key 'profile'.
     """
     print(f'Reading file: {file_path}')
 
+    statistics: EntityStatistics = {} if collect_statistics else None
+    profiles: EndpointProfiles = {} if collect_profile else None
+
     if verbose:
         start = timer()
-    flows = __read_flows_from_file(file_path)
+    flows = __read_flows_from_file(file_path, statistics, profiles)
     total_flow_count = len(flows)
     if verbose:
         print(f'Extracted {total_flow_count} flow details in: {timedelta(seconds=(timer()-start))}')
@@ -113,13 +158,95 @@ def parse_flows_file(file_path: str, verbose: bool = False) -> ApiOrganizedFlows
         'endpoints': organized_flows,
         'entities': list(object_structures.values()),
     }
+    if statistics is not None:
+        result['statistics'] = statistics
+    if profiles is not None:
+        result['profile'] = profiles
 
     return result
 
 
-def read_structure_json(file_path: str) -> ApiOrganizedFlows:
-    with open(file_path, 'r') as fp:
-        flows = json.load(fp)
+def parse_flows_files(file_paths: List[str], workers: int = None, verbose: bool = False, collect_statistics: bool = False, collect_profile: bool = False) -> ApiOrganizedFlows:
+    """
+    Parses the specified flows files concurrently in a pool of 'workers' processes (defaults to the number of CPUs)
+    and merges the extracted endpoints, entities and statistics into a single result.
+    """
+    file_paths = collect_flows_file_paths(file_paths)
+    if not file_paths:
+        raise ValueError('No flows files have been specified!')
+    file_count = len(file_paths)
+    workers = min(workers or os.cpu_count() or 1, file_count)
+    print(f'Reading {file_count} file(s) with {workers} worker(s)')
+
+    start = timer()
+    partial_results = []
+    if workers == 1:
+        for file_path in file_paths:
+            partial_results.append(__parse_flows_file_partial(file_path, collect_statistics, collect_profile))
+            __print_partial_result_progress(partial_results[-1], len(partial_results), file_count)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(__parse_flows_file_partial, file_path, collect_statistics, collect_profile) for file_path in file_paths]
+            for future in as_completed(futures):
+                partial_results.append(future.result())
+                __print_partial_result_progress(partial_results[-1], len(partial_results), file_count)
+    parse_duration = timer() - start
+
+    total_flow_count = sum(partial_result['flow_count'] for partial_result in partial_results)
+    total_file_size = sum(partial_result['file_size'] for partial_result in partial_results)
+    print(f'Parsed {total_flow_count} flows ({__format_megabytes(total_file_size)}) from {file_count} file(s) in: {timedelta(seconds=parse_duration)} ({__format_throughput(total_flow_count, total_file_size, parse_duration)})')
+
+    # Merge in a fixed order, as merging flows keeps some details of the first flow only
+    partial_results.sort(key=lambda partial_result: partial_result['file_path'])
+
+    if verbose:
+        start = timer()
+    flows: List[PssFlowDetails] = []
+    object_structures: Dict[str, PssObjectStructure] = {}
+    statistics: EntityStatistics = {} if collect_statistics else None
+    profiles: EndpointProfiles = {} if collect_profile else None
+    for partial_result in partial_results:
+        flows.extend(partial_result['flows'])
+        for object_name, object_structure in partial_result['object_structures'].items():
+            object_structures[object_name] = __merge_object_structures(object_structure, object_structures.get(object_name))
+        if statistics is not None:
+            merge_entity_statistics(statistics, partial_result['statistics'])
+        if profiles is not None:
+            merge_endpoint_profiles(profiles, partial_result['profile'])
+    organized_flows = __organize_flows(__singularize_flows(__organize_flows(flows)))
+    if verbose:
+        print(f'Merged partial results into {len(object_structures)} entity types and {sum(len(endpoints) for endpoints in organized_flows.values())} different PSS API endpoints in: {timedelta(seconds=(timer()-start))}')
+
+    result = {
+        'endpoints': organized_flows,
+        'entities': list(object_structures.values()),
+    }
+    if statistics is not None:
+        result['statistics'] = statistics
+    if profiles is not None:
+        result['profile'] = profiles
+
+    return result
+
+
+def read_response_bodies(file_path: str) -> List[Tuple[str, str, bytes]]:
+    """
+    Returns the service name, endpoint name and raw response body of every flow with a response in the specified flows file.
+    """
+    result: List[Tuple[str, str, bytes]] = []
+    for recorded_flow in __stream_flows_from_file(file_path):
+        if recorded_flow.response and recorded_flow.response.content:
+            service, endpoint = __get_service_and_endpoint(recorded_flow)
+            result.append((service, endpoint, recorded_flow.response.content))
+    return result
+
+
+def read_structure_json(file_path: str, use_cache: bool = True) -> ApiOrganizedFlows:
+    """
+    If use_cache is True, the decoded JSON will be cached in a marshal file next to the JSON file (extension .json.cache)
+    and will be read from there, as long as the JSON file's contents don't change.
+    """
+    flows = read_json(file_path, use_cache=use_cache)
     result = convert_organized_dicts_to_organized_flows(flows)
     return result
 
@@ -130,11 +257,28 @@ def store_structure_json(file_path: str, flow_details: ApiOrganizedFlows, indent
         json.dump(flow_details_dicts, fp, indent=indent)
 
 
+def store_profile_json(file_path: str, flow_details: ApiOrganizedFlows, indent: int = None) -> None:
+    profiles: EndpointProfiles = flow_details['profile']
+    total_count = sum(endpoint_profile.count for endpoints in profiles.values() for endpoint_profile in endpoints.values())
+    profile_dicts = {
+        service: {endpoint: profiles[service][endpoint].to_dict(total_count) for endpoint in sorted(profiles[service].keys())}
+        for service in sorted(profiles.keys())
+    }
+    with open(file_path, 'w') as fp:
+        json.dump(profile_dicts, fp, indent=indent)
+
+
 
 
 
 # ----- Private Functions -----
 
+def __collect_xml_statistics(root: ElementTree.Element, statistics: EntityStatistics) -> None:
+    for element in root.iter():
+        if element.attrib and 'version' not in element.attrib:
+            __update_entity_statistics(element, statistics)
+
+
 def __convert_api_structured_flows_to_dict(flows: ApiOrganizedFlows) -> ApiOrganizedFlowsDict:
     result = {}
     for service, endpoints in flows['endpoints'].items():
@@ -142,18 +286,28 @@ def __convert_api_structured_flows_to_dict(flows: ApiOrganizedFlows) -> ApiOrgan
             result.setdefault('endpoints', {}).setdefault(service, {})[endpoint] = dict(flow_details[0])
     temp_entities = {object_structure.object_type_name: object_structure.properties for object_structure in flows['entities']}
     result['entities'] = {key: temp_entities[key] for key in sorted(temp_entities.keys())}
+    if 'statistics' in flows:
+        result['statistics'] = __convert_entity_statistics_to_dict(flows['statistics'])
+    return result
+
+
+def __convert_entity_statistics_to_dict(statistics: EntityStatistics) -> Dict[str, Dict[str, dict]]:
+    result = {}
+    for entity_name in sorted(statistics.keys()):
+        properties = statistics[entity_name]
+        result[entity_name] = {property_name: properties[property_name].to_dict() for property_name in sorted(properties.keys())}
     return result
 
 
-def __convert_flow_to_dict(flow: HTTPFlow) -> NestedDict:
+def __convert_flow_to_dict(flow: HTTPFlow, statistics: EntityStatistics = None) -> NestedDict:
     result = {}
     result['method'] = flow.request.method # GET/POST
     if '?' in flow.request.path:
-        path, query_string = flow.request.path.split('?')
+        _, query_string = flow.request.path.split('?')
     else:
-        path, query_string = (flow.request.path, None)
+        query_string = None
 
-    result['service'], result['endpoint'] = path.split('/')[1:]
+    result['service'], result['endpoint'] = __get_service_and_endpoint(flow)
 
     result['query_parameters'] = {}
     if query_string:
@@ -184,7 +338,7 @@ def __convert_flow_to_dict(flow: HTTPFlow) -> NestedDict:
     result['response'] = flow.response.content.decode('utf-8') or None
     result['response_structure'] = {}
     if result['response']:
-        result['response_structure'] = __convert_xml_to_dict(ElementTree.fromstring(result['response']))
+        result['response_structure'] = __convert_xml_to_dict(ElementTree.fromstring(result['response']), statistics)
     return result
 
 
@@ -201,17 +355,22 @@ def __convert_json_to_dict(loaded_json: ResponseStructure) -> ResponseStructure:
     return result
 
 
-def __convert_xml_to_dict(root: ElementTree.Element) -> ResponseStructure:
+def __convert_xml_to_dict(root: ElementTree.Element, statistics: EntityStatistics = None) -> ResponseStructure:
     if root is None:
         return {}
 
     result = {}
     if root.attrib:
-        result['properties'] = {key: __determine_data_type(value, key) for key, value in root.attrib.items()}
+        if statistics is not None and 'version' not in root.attrib:
+            result['properties'] = __update_entity_statistics(root, statistics)
+        else:
+            result['properties'] = {key: __determine_data_type(value, key) for key, value in root.attrib.items()}
     for child in root:
         if child.tag not in result:
-            child_dict = __convert_xml_to_dict(child)
+            child_dict = __convert_xml_to_dict(child, statistics)
             result[child.tag] = child_dict[child.tag]
+        elif statistics is not None:
+            __collect_xml_statistics(child, statistics)
     return {root.tag: result}
 
 
@@ -245,6 +404,21 @@ def __determine_data_type(value: str, property_name: str = None) -> str:
     return 'str'
 
 
+def __format_megabytes(byte_count: int) -> str:
+    return f'{byte_count / 1048576:.2f} MiB'
+
+
+def __format_throughput(flow_count: int, byte_count: int, duration: float) -> str:
+    duration = duration or 1e-9
+    return f'{flow_count / duration:.1f} flows/s, {__format_megabytes(byte_count / duration)}/s'
+
+
+def __get_service_and_endpoint(flow: HTTPFlow) -> Tuple[str, str]:
+    path = flow.request.path.split('?')[0]
+    service, endpoint = path.split('/')[1:]
+    return service, endpoint
+
+
 def __get_object_structures_from_response_structure(response_structure: ResponseStructure) -> Dict[str, List[PssObjectStructure]]:
     result: Dict[str, List[PssObjectStructure]] = {}
     for key, value in response_structure.items():
@@ -326,22 +500,40 @@ def __organize_flows(extracted_flow_details: List[PssFlowDetails]) -> ApiOrganiz
     return result
 
 
-def __read_flows_from_file(file_path: str) -> List[PssFlowDetails]:
-    if not os.path.isfile(file_path):
-        raise FileNotFoundError(f'The specified file could not be found at: {file_path}')
-
-    result: List[PssFlowDetails] = []
+def __parse_flows_file_partial(file_path: str, collect_statistics: bool, collect_profile: bool) -> dict:
+    """
+    Parses a single flows file. Runs in a worker process, so the result must be picklable.
+    """
+    start = timer()
+    statistics: EntityStatistics = {} if collect_statistics else None
+    profiles: EndpointProfiles = {} if collect_profile else None
+    flows = __read_flows_from_file(file_path, statistics, profiles)
+    result = {
+        'duration': None,
+        'file_path': file_path,
+        'file_size': os.path.getsize(file_path),
+        'flow_count': len(flows),
+        'object_structures': __get_object_structures_from_flows(flows),
+        'flows': list(__singularize_flows(__organize_flows(flows))),
+        'profile': profiles,
+        'statistics': statistics,
+    }
+    result['duration'] = timer() - start
+    return result
 
-    with open(file_path, 'rb') as fp:
-        flow_reader: FlowReader = FlowReader(fp)
 
-        try:
-            tnetstring.load(flow_reader.fo)
-        except ValueError as e:
-            raise Exception(f'The specified file is not a Flows file: {file_path}') from e
+def __print_partial_result_progress(partial_result: dict, finished_count: int, file_count: int) -> None:
+    throughput = __format_throughput(partial_result['flow_count'], partial_result['file_size'], partial_result['duration'])
+    print(f'[{finished_count}/{file_count}] Parsed {partial_result["flow_count"]} flows ({__format_megabytes(partial_result["file_size"])}) in {timedelta(seconds=partial_result["duration"])} ({throughput}): {partial_result["file_path"]}')
 
-        result = [PssFlowDetails(__convert_flow_to_dict(recorded_flow)) for recorded_flow in flow_reader.stream()]
 
+def __read_flows_from_file(file_path: str, statistics: EntityStatistics = None, profiles: EndpointProfiles = None) -> List[PssFlowDetails]:
+    result: List[PssFlowDetails] = []
+    for recorded_flow in __stream_flows_from_file(file_path):
+        flow_dict = __convert_flow_to_dict(recorded_flow, statistics)
+        if profiles is not None:
+            __update_endpoint_profiles(recorded_flow, flow_dict, profiles)
+        result.append(PssFlowDetails(flow_dict))
     return result
 
 
@@ -357,6 +549,51 @@ def __singularize_flows(organized_flows: ApiOrganizedFlows) -> Set[PssFlowDetail
     return result
 
 
+def __stream_flows_from_file(file_path: str) -> Iterator[HTTPFlow]:
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f'The specified file could not be found at: {file_path}')
+
+    with open(file_path, 'rb') as fp:
+        flow_reader: FlowReader = FlowReader(fp)
+
+        try:
+            tnetstring.load(flow_reader.fo)
+        except ValueError as e:
+            raise Exception(f'The specified file is not a Flows file: {file_path}') from e
+        # Validating the file reads the first flow, so start over to not skip it
+        fp.seek(0)
+
+        yield from flow_reader.stream()
+
+
+def __update_endpoint_profiles(flow: HTTPFlow, flow_dict: NestedDict, profiles: EndpointProfiles) -> None:
+    endpoint_profile = profiles.setdefault(flow_dict['service'], {}).get(flow_dict['endpoint'])
+    if endpoint_profile is None:
+        endpoint_profile = profiles[flow_dict['service']][flow_dict['endpoint']] = EndpointProfile()
+    endpoint_profile.add(
+        flow.request.timestamp_start,
+        flow.response.timestamp_end,
+        len(flow.request.raw_content or b''),
+        len(flow.response.raw_content or b''),
+    )
+
+
+def __update_entity_statistics(element: ElementTree.Element, statistics: EntityStatistics) -> Dict[str, str]:
+    """
+    Feeds the attribute values of an entity element into the statistics and returns the determined data types.
+    """
+    result = {}
+    entity_statistics = statistics.setdefault(element.tag, {})
+    for key, value in element.attrib.items():
+        data_type = __determine_data_type(value, key)
+        property_statistics = entity_statistics.get(key)
+        if property_statistics is None:
+            property_statistics = entity_statistics[key] = PropertyStatistics()
+        property_statistics.add(value, data_type)
+        result[key] = data_type
+    return result
+
+
 
 
 
@@ -366,13 +603,40 @@ if __name__ == "__main__":
     app_start = timer()
     if (len(sys.argv) == 1):
         raise ValueError('The path to the flows file has not been specified!')
-    file_path = ' '.join(sys.argv[1:])
-    flows = parse_flows_file(file_path, verbose=True)
 
-    file_name, _ = os.path.splitext(file_path)
-    storage_path = f'{file_name}.json'
+    parser = argparse.ArgumentParser(description='Create a structure description of the PSS API from recorded flows files.')
+    parser.add_argument('paths', nargs='+', help='Paths to flows files, directories containing flows files or glob patterns.')
+    parser.add_argument('-o', '--output', help='Path to the JSON file to be created. Defaults to the flows file path with the extension .json for a single file or to pss_api.json in the common directory for multiple files.')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--statistics', action='store_true', help='Collect value statistics per entity property.')
+    parser.add_argument('--profile', action='store_true', help='Additionally create a latency and payload profile per endpoint next to the JSON file (extension .profile.json).')
+    args = parser.parse_args()
+
+    paths = args.paths
+    joined_path = ' '.join(paths)
+    if len(paths) > 1 and os.path.isfile(joined_path):
+        # Support unquoted file paths containing spaces
+        paths = [joined_path]
+
+    file_paths = collect_flows_file_paths(paths)
+    if len(file_paths) == 1:
+        flows = parse_flows_file(file_paths[0], verbose=True, collect_statistics=args.statistics, collect_profile=args.profile)
+    else:
+        flows = parse_flows_files(file_paths, workers=args.workers, verbose=True, collect_statistics=args.statistics, collect_profile=args.profile)
+
+    if args.output:
+        storage_path = args.output
+    elif len(file_paths) == 1:
+        file_name, _ = os.path.splitext(file_paths[0])
+        storage_path = f'{file_name}.json'
+    else:
+        storage_path = os.path.join(os.path.commonpath([os.path.dirname(os.path.abspath(file_path)) for file_path in file_paths]), 'pss_api.json')
     start = timer()
     store_structure_json(storage_path, flows, indent=2)
     end = timer()
     print(f'Stored JSON encoded PSS API endpoint information in {timedelta(seconds=(end-start))} at: {storage_path}')
+    if args.profile:
+        profile_path = f'{os.path.splitext(storage_path)[0]}.profile.json'
+        store_profile_json(profile_path, flows, indent=2)
+        print(f'Stored PSS API endpoint profile at: {profile_path}')
     print(f'Total execution time: {timedelta(seconds=(end-app_start))}')
\ No newline at end of file
@@ -0,0 +1,472 @@
+from datetime import datetime
+from hashlib import blake2b
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+# ----- Constants and type definitions -----
+
+SketchValue = Union[int, float, str]
+
+DEFAULT_HYPER_LOG_LOG_PRECISION: int = 10
+DEFAULT_RESERVOIR_SIZE: int = 16
+DEFAULT_RESERVOIR_SEED: int = 0
+DEFAULT_TOP_K_CAPACITY: int = 32
+DEFAULT_ENUM_MAX_DISTINCT: int = 24
+DEFAULT_QUANTILE_RELATIVE_ACCURACY: float = 0.01
+DEFAULT_QUANTILE_MAX_BINS: int = 1024
+
+
+
+
+
+# ----- Sketches -----
+
+class HyperLogLog():
+    """
+    Estimates the number of distinct values seen using 2^precision single byte registers.
+    """
+    def __init__(self, precision: int = DEFAULT_HYPER_LOG_LOG_PRECISION) -> None:
+        self.__precision: int = precision
+        self.__registers: bytearray = bytearray(1 << precision)
+
+    @property
+    def precision(self) -> int:
+        return self.__precision
+
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.__precision)
+        remaining = hashed & ((1 << (64 - self.__precision)) - 1)
+        rank = (64 - self.__precision) - remaining.bit_length() + 1
+        if rank > self.__registers[index]:
+            self.__registers[index] = rank
+
+
+    def estimate(self) -> int:
+        register_count = len(self.__registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        raw_estimate = alpha * register_count * register_count / sum(2.0 ** -register for register in self.__registers)
+        empty_registers = self.__registers.count(0)
+        if raw_estimate <= 2.5 * register_count and empty_registers:
+            # Small range correction (linear counting)
+            return round(register_count * math.log(register_count / empty_registers))
+        return round(raw_estimate)
+
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        if other.precision != self.__precision:
+            raise ValueError('Cannot merge HyperLogLog sketches of different precision.')
+        self.__registers = bytearray(map(max, self.__registers, other.__registers))
+
+
+class ReservoirSample():
+    """
+    Keeps a uniform random sample of at most 'size' values out of all values seen.
+    The sample is drawn from a seeded generator, so the same input yields the same sample on every run.
+    """
+    def __init__(self, size: int = DEFAULT_RESERVOIR_SIZE, seed: int = DEFAULT_RESERVOIR_SEED) -> None:
+        self.__random: random.Random = random.Random(seed)
+        self.__size: int = size
+        self.__seen: int = 0
+        self.__values: List[SketchValue] = []
+
+    @property
+    def seen(self) -> int:
+        return self.__seen
+
+    @property
+    def values(self) -> List[SketchValue]:
+        return list(self.__values)
+
+
+    def add(self, value: SketchValue) -> None:
+        self.__seen += 1
+        if len(self.__values) < self.__size:
+            self.__values.append(value)
+        else:
+            index = self.__random.randrange(self.__seen)
+            if index < self.__size:
+                self.__values[index] = value
+
+
+    def merge(self, other: 'ReservoirSample') -> None:
+        """
+        Draws the merged sample from both samples weighted by the number of values each of them has seen.
+        """
+        own_values = list(self.__values)
+        other_values = other.values
+        self.__random.shuffle(own_values)
+        self.__random.shuffle(other_values)
+        own_weight = self.__seen
+        other_weight = other.seen
+        merged_values = []
+        while len(merged_values) < self.__size and (own_values or other_values):
+            if other_values and (not own_values or self.__random.random() * (own_weight + other_weight) >= own_weight):
+                merged_values.append(other_values.pop())
+            else:
+                merged_values.append(own_values.pop())
+        self.__values = merged_values
+        self.__seen += other.seen
+
+
+class TopK():
+    """
+    Tracks the most frequent values with a fixed number of counters (Misra-Gries summary).
+    As long as no counter had to be evicted, the tracked values and counts are exact.
+    """
+    def __init__(self, capacity: int = DEFAULT_TOP_K_CAPACITY) -> None:
+        self.__capacity: int = capacity
+        self.__counts: Dict[SketchValue, int] = {}
+        self.__is_exact: bool = True
+
+    @property
+    def is_exact(self) -> bool:
+        return self.__is_exact
+
+
+    def add(self, value: SketchValue) -> None:
+        if value in self.__counts:
+            self.__counts[value] += 1
+        elif len(self.__counts) < self.__capacity:
+            self.__counts[value] = 1
+        else:
+            self.__is_exact = False
+            for key in list(self.__counts.keys()):
+                self.__counts[key] -= 1
+                if self.__counts[key] == 0:
+                    del self.__counts[key]
+
+
+    def merge(self, other: 'TopK') -> None:
+        for value, count in other.most_common():
+            self.__counts[value] = self.__counts.get(value, 0) + count
+        self.__is_exact = self.__is_exact and other.is_exact
+        if len(self.__counts) > self.__capacity:
+            self.__is_exact = False
+            threshold = sorted(self.__counts.values(), reverse=True)[self.__capacity]
+            self.__counts = {value: count - threshold for value, count in self.__counts.items() if count > threshold}
+
+
+    def most_common(self, count: int = None) -> List[Tuple[SketchValue, int]]:
+        result = sorted(self.__counts.items(), key=lambda item: (-item[1], str(item[0])))
+        if count is not None:
+            result = result[:count]
+        return result
+
+
+class PropertyStatistics():
+    """
+    Collects value statistics for a single entity property in a fixed amount of memory.
+    """
+    def __init__(self) -> None:
+        self.__count: int = 0
+        self.__datetime_range: List[datetime] = [None, None]
+        self.__distinct: HyperLogLog = HyperLogLog()
+        self.__numeric_range: List[Union[int, float]] = [None, None]
+        self.__samples: ReservoirSample = ReservoirSample()
+        self.__top_values: TopK = TopK()
+        self.__type_counts: Dict[str, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def distinct_estimate(self) -> int:
+        return self.__distinct.estimate()
+
+    @property
+    def maximum(self) -> Union[int, float, datetime]:
+        return self.__get_range()[1]
+
+    @property
+    def minimum(self) -> Union[int, float, datetime]:
+        return self.__get_range()[0]
+
+    @property
+    def type_counts(self) -> Dict[str, int]:
+        return dict(self.__type_counts)
+
+
+    def add(self, value: str, data_type: str) -> None:
+        self.__count += 1
+        if not value:
+            return
+
+        self.__type_counts[data_type] = self.__type_counts.get(data_type, 0) + 1
+        self.__distinct.add(value)
+        self.__samples.add(value)
+        self.__top_values.add(value)
+
+        if data_type in ('int', 'float'):
+            _update_range(self.__numeric_range, int(value) if data_type == 'int' else float(value))
+        elif data_type == 'datetime':
+            _update_range(self.__datetime_range, _parse_datetime(value))
+
+
+    def get_enum_values(self, max_distinct: int = DEFAULT_ENUM_MAX_DISTINCT) -> Optional[List[str]]:
+        """
+        Returns the sorted list of observed values, if the property looks like an enumeration. Else returns None.
+        """
+        if list(self.__type_counts.keys()) != ['str'] or not self.__top_values.is_exact:
+            return None
+        values = [value for value, _ in self.__top_values.most_common()]
+        if 1 < len(values) <= max_distinct and len(values) < self.__type_counts['str']:
+            return sorted(values)
+        return None
+
+
+    def merge(self, other: 'PropertyStatistics') -> None:
+        self.__count += other.__count
+        for data_type, count in other.__type_counts.items():
+            self.__type_counts[data_type] = self.__type_counts.get(data_type, 0) + count
+        self.__distinct.merge(other.__distinct)
+        self.__samples.merge(other.__samples)
+        self.__top_values.merge(other.__top_values)
+        for value in other.__numeric_range:
+            if value is not None:
+                _update_range(self.__numeric_range, value)
+        for value in other.__datetime_range:
+            if value is not None:
+                _update_range(self.__datetime_range, value)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        minimum, maximum = self.__get_range()
+        result = {
+            'count': self.__count,
+            'types': {key: self.__type_counts[key] for key in sorted(self.__type_counts.keys())},
+            'distinct_estimate': self.distinct_estimate,
+            'min': _convert_to_json_value(minimum),
+            'max': _convert_to_json_value(maximum),
+            'samples': self.__samples.values,
+            'top_values': [list(item) for item in self.__top_values.most_common(10)],
+            'enum_values': self.get_enum_values(),
+        }
+        return result
+
+
+    def __get_range(self) -> List[Union[int, float, datetime]]:
+        if self.__numeric_range[0] is not None:
+            return self.__numeric_range
+        return self.__datetime_range
+
+
+class QuantileSketch():
+    """
+    Estimates quantiles of positive values with a bounded relative error using logarithmically sized buckets (DDSketch).
+    If there are more than 'max_bins' buckets, the lowest buckets get collapsed, so high quantiles stay accurate.
+    """
+    def __init__(self, relative_accuracy: float = DEFAULT_QUANTILE_RELATIVE_ACCURACY, max_bins: int = DEFAULT_QUANTILE_MAX_BINS) -> None:
+        self.__bins: Dict[int, int] = {}
+        self.__count: int = 0
+        self.__gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma: float = math.log(self.__gamma)
+        self.__max_bins: int = max_bins
+        self.__maximum: float = None
+        self.__minimum: float = None
+        self.__sum: float = 0.0
+        self.__zero_count: int = 0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def maximum(self) -> float:
+        return self.__maximum
+
+    @property
+    def minimum(self) -> float:
+        return self.__minimum
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+
+    def add(self, value: float) -> None:
+        self.__count += 1
+        self.__sum += value
+        if self.__minimum is None or value < self.__minimum:
+            self.__minimum = value
+        if self.__maximum is None or value > self.__maximum:
+            self.__maximum = value
+
+        if value <= 0:
+            self.__zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self.__log_gamma)
+            self.__bins[key] = self.__bins.get(key, 0) + 1
+            if len(self.__bins) > self.__max_bins:
+                self.__collapse()
+
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.__gamma != self.__gamma:
+            raise ValueError('Cannot merge quantile sketches of different relative accuracy.')
+        if not other.__count:
+            return
+        self.__count += other.__count
+        self.__sum += other.__sum
+        self.__zero_count += other.__zero_count
+        if self.__minimum is None or other.__minimum < self.__minimum:
+            self.__minimum = other.__minimum
+        if self.__maximum is None or other.__maximum > self.__maximum:
+            self.__maximum = other.__maximum
+        for key, count in other.__bins.items():
+            self.__bins[key] = self.__bins.get(key, 0) + count
+        while len(self.__bins) > self.__max_bins:
+            self.__collapse()
+
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        if not self.__count:
+            return None
+        rank = quantile * (self.__count - 1)
+        if rank < self.__zero_count:
+            return max(self.__minimum, 0)
+        cumulated_count = self.__zero_count
+        for key in sorted(self.__bins.keys()):
+            cumulated_count += self.__bins[key]
+            if cumulated_count > rank:
+                value = 2 * self.__gamma ** key / (self.__gamma + 1)
+                return min(max(value, self.__minimum), self.__maximum)
+        return self.__maximum
+
+
+    def to_dict(self, quantiles: Tuple[float, ...] = (0.5, 0.9, 0.95, 0.99)) -> Dict[str, Any]:
+        result = {
+            'count': self.__count,
+            'mean': self.__sum / self.__count if self.__count else None,
+            'min': self.__minimum,
+        }
+        for quantile in quantiles:
+            result[f'p{round(quantile * 100)}'] = self.quantile(quantile)
+        result['max'] = self.__maximum
+        return result
+
+
+    def __collapse(self) -> None:
+        lowest_key, second_lowest_key = sorted(self.__bins.keys())[:2]
+        self.__bins[second_lowest_key] += self.__bins.pop(lowest_key)
+
+
+class EndpointProfile():
+    """
+    Aggregates latency, request and response sizes and call timestamps of a single endpoint.
+    """
+    def __init__(self) -> None:
+        self.__first_call: float = None
+        self.__last_call: float = None
+        self.__latency: QuantileSketch = QuantileSketch()
+        self.__request_size: QuantileSketch = QuantileSketch()
+        self.__response_size: QuantileSketch = QuantileSketch()
+
+    @property
+    def count(self) -> int:
+        return self.__request_size.count
+
+
+    def add(self, timestamp_start: float, timestamp_end: Optional[float], request_size: int, response_size: int) -> None:
+        if timestamp_start is not None:
+            if self.__first_call is None or timestamp_start < self.__first_call:
+                self.__first_call = timestamp_start
+            if self.__last_call is None or timestamp_start > self.__last_call:
+                self.__last_call = timestamp_start
+            if timestamp_end is not None:
+                self.__latency.add(timestamp_end - timestamp_start)
+        self.__request_size.add(request_size)
+        self.__response_size.add(response_size)
+
+
+    def merge(self, other: 'EndpointProfile') -> None:
+        for timestamp in (other.__first_call, other.__last_call):
+            if timestamp is not None:
+                if self.__first_call is None or timestamp < self.__first_call:
+                    self.__first_call = timestamp
+                if self.__last_call is None or timestamp > self.__last_call:
+                    self.__last_call = timestamp
+        self.__latency.merge(other.__latency)
+        self.__request_size.merge(other.__request_size)
+        self.__response_size.merge(other.__response_size)
+
+
+    def to_dict(self, total_count: int = None) -> Dict[str, Any]:
+        duration = (self.__last_call - self.__first_call) if self.__first_call is not None else 0
+        result = {
+            'count': self.count,
+            'call_share': self.count / total_count if total_count else None,
+            'first_call': _convert_to_json_value(datetime.fromtimestamp(self.__first_call)) if self.__first_call is not None else None,
+            'last_call': _convert_to_json_value(datetime.fromtimestamp(self.__last_call)) if self.__last_call is not None else None,
+            'calls_per_minute': self.count * 60 / duration if duration > 0 else None,
+            'latency_seconds': self.__latency.to_dict(),
+            'request_size_bytes': self.__request_size.to_dict(),
+            'response_size_bytes': self.__response_size.to_dict(),
+        }
+        return result
+
+
+EndpointProfiles = Dict[str, Dict[str, EndpointProfile]]
+EntityStatistics = Dict[str, Dict[str, PropertyStatistics]]
+
+
+
+
+
+# ----- Public Functions -----
+
+def merge_endpoint_profiles(profiles1: EndpointProfiles, profiles2: EndpointProfiles) -> EndpointProfiles:
+    """
+    Merges profiles2 into profiles1 and returns profiles1.
+    """
+    for service_name, endpoints in profiles2.items():
+        service_profiles = profiles1.setdefault(service_name, {})
+        for endpoint_name, endpoint_profile in endpoints.items():
+            if endpoint_name in service_profiles:
+                service_profiles[endpoint_name].merge(endpoint_profile)
+            else:
+                service_profiles[endpoint_name] = endpoint_profile
+    return profiles1
+
+
+def merge_entity_statistics(statistics1: EntityStatistics, statistics2: EntityStatistics) -> EntityStatistics:
+    """
+    Merges statistics2 into statistics1 and returns statistics1.
+    """
+    for entity_name, properties in statistics2.items():
+        entity_statistics = statistics1.setdefault(entity_name, {})
+        for property_name, property_statistics in properties.items():
+            if property_name in entity_statistics:
+                entity_statistics[property_name].merge(property_statistics)
+            else:
+                entity_statistics[property_name] = property_statistics
+    return statistics1
+
+
+
+
+
+# ----- Private Functions -----
+
+def _convert_to_json_value(value: Union[int, float, datetime, None]) -> Union[int, float, str, None]:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+
+
+def _update_range(value_range: list, value: Union[int, float, datetime]) -> None:
+    if value_range[0] is None or value < value_range[0]:
+        value_range[0] = value
+    if value_range[1] is None or value > value_range[1]:
+        value_range[1] = value
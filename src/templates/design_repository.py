@@ -0,0 +1,156 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+import asyncio as _asyncio
+from typing import Any as _Any
+from typing import Callable as _Callable
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+from typing import Type as _Type
+
+{% for design in designs %}
+from .entities import {{design.entity_name}} as _{{design.entity_name}}
+{% endfor %}
+{% for design in designs %}
+from .entities.raw import {{design.entity_name}}Raw as _{{design.entity_name}}Raw
+{% endfor %}
+{% for service_name in design_service_names %}
+from .services.raw import {{service_name}}Raw as _{{service_name}}Raw
+{% endfor %}
+
+
+
+# ---------- Constants ----------
+
+# entity type: (raw service function, parameter names, raw entity type, id property, foreign key properties)
+DESIGN_LOADERS: _Dict[_Type, _Tuple[_Callable, _Tuple[str, ...], _Type, str, _Tuple[str, ...]]] = {
+{% for design in designs %}
+    _{{design.entity_name}}: (
+        _{{design.service_name}}Raw.{{design.function_name}},
+        ({% for parameter_name in design.parameter_names %}'{{parameter_name}}', {% endfor %}),
+        _{{design.entity_name}}Raw,
+        '{{design.id_property}}',
+        ({% for foreign_key in design.foreign_keys %}'{{foreign_key}}', {% endfor %}),
+    ),
+{% endfor %}
+}
+
+
+
+# ---------- Classes ----------
+
+class DesignSnapshot():
+    """
+    Immutable set of all designs of one design version with hash indexes on the id and foreign key properties.
+    """
+    def __init__(self, design_version: int, designs: _Dict[_Type, _List[_Any]]) -> None:
+        self.__design_version: int = design_version
+        self.__designs: _Dict[_Type, _List[_Any]] = designs
+        self.__by_id: _Dict[_Type, _Dict[_Any, _Any]] = {}
+        self.__by_foreign_key: _Dict[_Tuple[_Type, str], _Dict[_Any, _List[_Any]]] = {}
+
+        for entity_type, entities in designs.items():
+            _, _, raw_entity_type, id_property, foreign_keys = DESIGN_LOADERS[entity_type]
+            # Read the values through the raw properties, as entity classes may override e.g. 'id'
+            get_id = getattr(raw_entity_type, id_property).fget
+            self.__by_id[entity_type] = {get_id(entity): entity for entity in entities}
+            for foreign_key in foreign_keys:
+                get_foreign_key = getattr(raw_entity_type, foreign_key).fget
+                index: _Dict[_Any, _List[_Any]] = {}
+                for entity in entities:
+                    index.setdefault(get_foreign_key(entity), []).append(entity)
+                self.__by_foreign_key[(entity_type, foreign_key)] = index
+
+    @property
+    def design_version(self) -> int:
+        return self.__design_version
+
+
+    def find(self, entity_type: _Type, foreign_key: str, value: _Any) -> _List[_Any]:
+        return list(self.__by_foreign_key[(entity_type, foreign_key)].get(value, ()))
+
+
+    def get(self, entity_type: _Type, id: _Any) -> _Optional[_Any]:
+        return self.__by_id[entity_type].get(id)
+
+
+    def get_all(self, entity_type: _Type) -> _List[_Any]:
+        return list(self.__designs[entity_type])
+
+
+class DesignRepository():
+    """
+    Loads all designs once per design version and serves O(1) lookups by id and by foreign key.
+    A new design version gets loaded completely before it replaces the current one, so lookups
+    never see a partially loaded state.
+    """
+    def __init__(self, production_server: str, language_key: str = 'en', **params) -> None:
+        self.__lock: _asyncio.Lock = _asyncio.Lock()
+        self.__params: _Dict[str, _Any] = dict(params, language_key=language_key)
+        self.__production_server: str = production_server
+        self.__snapshot: _Optional[DesignSnapshot] = None
+
+    @property
+    def design_version(self) -> _Optional[int]:
+        snapshot = self.__snapshot
+        return snapshot.design_version if snapshot else None
+
+    @property
+    def snapshot(self) -> DesignSnapshot:
+        if self.__snapshot is None:
+            raise RuntimeError('No designs have been loaded, yet. Call update() first.')
+        return self.__snapshot
+
+
+    async def update(self, design_version: int, force: bool = False) -> bool:
+        """
+        Loads all designs for the design version, if it differs from the current one. Returns True, if designs have been loaded.
+        """
+        if not force and self.design_version == design_version:
+            return False
+        async with self.__lock:
+            if not force and self.design_version == design_version:
+                return False
+            entity_types = list(DESIGN_LOADERS.keys())
+            results = await _asyncio.gather(*[self.__load(entity_type, design_version) for entity_type in entity_types])
+            self.__snapshot = DesignSnapshot(design_version, dict(zip(entity_types, results)))
+        return True
+
+
+    def find(self, entity_type: _Type, foreign_key: str, value: _Any) -> _List[_Any]:
+        return self.snapshot.find(entity_type, foreign_key, value)
+
+
+    def get(self, entity_type: _Type, id: _Any) -> _Optional[_Any]:
+        return self.snapshot.get(entity_type, id)
+
+
+    def get_all(self, entity_type: _Type) -> _List[_Any]:
+        return self.snapshot.get_all(entity_type)
+{% for design in designs %}
+
+
+    def get_{{design.entity_name_snake_case}}(self, {{design.id_property}}: int) -> _Optional[_{{design.entity_name}}]:
+        return self.snapshot.get(_{{design.entity_name}}, {{design.id_property}})
+
+
+    def get_all_{{design.entity_name_snake_case}}s(self) -> _List[_{{design.entity_name}}]:
+        return self.snapshot.get_all(_{{design.entity_name}})
+{% for foreign_key in design.foreign_keys %}
+
+
+    def find_{{design.entity_name_snake_case}}s_by_{{foreign_key}}(self, {{foreign_key}}: int) -> _List[_{{design.entity_name}}]:
+        return self.snapshot.find(_{{design.entity_name}}, '{{foreign_key}}', {{foreign_key}})
+{% endfor %}
+{% endfor %}
+
+
+    async def __load(self, entity_type: _Type, design_version: int) -> _List[_Any]:
+        function, parameter_names, _, _, _ = DESIGN_LOADERS[entity_type]
+        params = {parameter_name: self.__params.get(parameter_name) for parameter_name in parameter_names}
+        params['design_version'] = design_version
+        result = await function(self.__production_server, **params)
+        return result
@@ -0,0 +1,31 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+from typing import Dict as _Dict
+
+import numpy as _np
+
+from ..entities.raw import {{entity.name}}Raw as _{{entity.name}}Raw
+from .table_base import TableBase as _TableBase
+
+
+class {{entity.name}}Table(_TableBase):
+    COLUMN_TYPES: _Dict[str, str] = {
+{% for property in entity.properties %}
+        '{{property.name_snake_case}}': '{{property.type}}',
+{% endfor %}
+    }
+    ENTITY_RAW_TYPE: type = _{{entity.name}}Raw
+    XML_NODE_NAME: str = '{{entity.xml_node_name}}'
+    XML_PROPERTY_NAMES: _Dict[str, str] = {
+{% for property in entity.properties %}
+        '{{property.name_snake_case}}': '{{property.name}}',
+{% endfor %}
+    }
+{% for property in entity.properties if property.name_snake_case not in reserved_names %}
+
+    @property
+    def {{property.name_snake_case}}(self) -> _np.ndarray:
+        return self['{{property.name_snake_case}}']
+{% endfor %}
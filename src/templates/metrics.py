@@ -0,0 +1,211 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+from bisect import bisect_left as _bisect_left
+import asyncio as _asyncio
+import logging as _logging
+from time import perf_counter as _perf_counter
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+
+
+
+# ---------- Constants ----------
+
+LATENCY_BUCKETS: _List[float] = [0.001 * 2 ** exponent for exponent in range(17)] # 1 ms to ~65 s
+PARSE_TIME_BUCKETS: _List[float] = [0.0001 * 2 ** exponent for exponent in range(17)] # 0.1 ms to ~6.5 s
+RESPONSE_BYTES_BUCKETS: _List[float] = [256 * 4 ** exponent for exponent in range(10)] # 256 B to 64 MiB
+ENTITY_COUNT_BUCKETS: _List[float] = [4 ** exponent for exponent in range(10)] # 1 to ~262k
+EVENT_LOOP_LAG_BUCKETS: _List[float] = [0.0001 * 2 ** exponent for exponent in range(15)] # 0.1 ms to ~1.6 s
+
+ENABLED: bool = False
+
+
+
+# ---------- Classes ----------
+
+class Histogram():
+    def __init__(self, bucket_bounds: _List[float]) -> None:
+        self.__bucket_bounds: _List[float] = sorted(bucket_bounds)
+        self.__bucket_counts: _List[int] = [0] * (len(self.__bucket_bounds) + 1)
+        self.__count: int = 0
+        self.__maximum: float = None
+        self.__minimum: float = None
+        self.__sum: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+
+    def observe(self, value: float) -> None:
+        self.__bucket_counts[_bisect_left(self.__bucket_bounds, value)] += 1
+        self.__count += 1
+        self.__sum += value
+        if self.__minimum is None or value < self.__minimum:
+            self.__minimum = value
+        if self.__maximum is None or value > self.__maximum:
+            self.__maximum = value
+
+
+    def get_quantile(self, quantile: float) -> _Optional[float]:
+        """Returns the upper bound of the bucket containing the quantile (or the maximum for the overflow bucket)."""
+        if not self.__count:
+            return None
+        rank = quantile * self.__count
+        cumulated_count = 0
+        for index, bucket_count in enumerate(self.__bucket_counts):
+            cumulated_count += bucket_count
+            if cumulated_count >= rank and bucket_count:
+                if index < len(self.__bucket_bounds):
+                    return min(self.__bucket_bounds[index], self.__maximum)
+                return self.__maximum
+        return self.__maximum
+
+
+    def get_snapshot(self) -> _Dict[str, _Any]:
+        return {
+            'buckets': list(zip(self.__bucket_bounds + [float('inf')], self.__bucket_counts)),
+            'count': self.__count,
+            'max': self.__maximum,
+            'min': self.__minimum,
+            'p50': self.get_quantile(0.5),
+            'p90': self.get_quantile(0.9),
+            'p99': self.get_quantile(0.99),
+            'sum': self.__sum,
+        }
+
+
+class EndpointMetrics():
+    def __init__(self, path: str) -> None:
+        self.__path: str = path
+        self.reset()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+
+    def record(self, latency: float, response_bytes: int, parse_time: float, entity_count: int) -> None:
+        self.latency.observe(latency)
+        self.response_bytes.observe(response_bytes)
+        self.parse_time.observe(parse_time)
+        self.entity_count.observe(entity_count)
+
+
+    def reset(self) -> None:
+        self.entity_count: Histogram = Histogram(ENTITY_COUNT_BUCKETS)
+        self.latency: Histogram = Histogram(LATENCY_BUCKETS)
+        self.parse_time: Histogram = Histogram(PARSE_TIME_BUCKETS)
+        self.response_bytes: Histogram = Histogram(RESPONSE_BYTES_BUCKETS)
+
+
+    def get_snapshot(self) -> _Dict[str, _Dict[str, _Any]]:
+        return {
+            'entity_count': self.entity_count.get_snapshot(),
+            'latency': self.latency.get_snapshot(),
+            'parse_time': self.parse_time.get_snapshot(),
+            'response_bytes': self.response_bytes.get_snapshot(),
+        }
+
+
+class MetricsExporter():
+    """
+    Base class for exporters. Override 'export' to send the metrics anywhere.
+    """
+    def export(self, snapshot: _Dict[str, _Dict[str, _Dict[str, _Any]]]) -> None:
+        raise NotImplementedError()
+
+
+class LoggingExporter(MetricsExporter):
+    def __init__(self, logger: _logging.Logger = None, level: int = _logging.INFO) -> None:
+        self.__level: int = level
+        self.__logger: _logging.Logger = logger or _logging.getLogger(__name__)
+
+
+    def export(self, snapshot: _Dict[str, _Dict[str, _Dict[str, _Any]]]) -> None:
+        for path, endpoint_snapshot in snapshot.items():
+            latency = endpoint_snapshot['latency']
+            if latency['count']:
+                self.__logger.log(
+                    self.__level,
+                    '%s: %d calls, latency p50 %.4fs p99 %.4fs, %.0f bytes/call, parse time p50 %.4fs, %.1f entities/call',
+                    path,
+                    latency['count'],
+                    latency['p50'],
+                    latency['p99'],
+                    endpoint_snapshot['response_bytes']['sum'] / latency['count'],
+                    endpoint_snapshot['parse_time']['p50'],
+                    endpoint_snapshot['entity_count']['sum'] / latency['count'],
+                )
+
+
+
+# ---------- Registry ----------
+
+__ENDPOINTS: _Dict[str, EndpointMetrics] = {}
+__EXPORTER: MetricsExporter = None
+
+
+def register_endpoint(path: str) -> EndpointMetrics:
+    result = __ENDPOINTS.get(path)
+    if result is None:
+        result = __ENDPOINTS[path] = EndpointMetrics(path)
+    return result
+
+
+def enable(exporter: MetricsExporter = None) -> None:
+    global ENABLED
+    ENABLED = True
+    if exporter is not None:
+        set_exporter(exporter)
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def set_exporter(exporter: MetricsExporter) -> None:
+    global __EXPORTER
+    __EXPORTER = exporter
+
+
+def get_snapshot() -> _Dict[str, _Dict[str, _Dict[str, _Any]]]:
+    return {path: endpoint_metrics.get_snapshot() for path, endpoint_metrics in sorted(__ENDPOINTS.items())}
+
+
+def export() -> None:
+    if __EXPORTER is not None:
+        __EXPORTER.export(get_snapshot())
+
+
+def reset() -> None:
+    global EVENT_LOOP_LAG
+    for endpoint_metrics in __ENDPOINTS.values():
+        endpoint_metrics.reset()
+    EVENT_LOOP_LAG = Histogram(EVENT_LOOP_LAG_BUCKETS)
+
+
+
+# ---------- Event loop lag ----------
+
+EVENT_LOOP_LAG: Histogram = Histogram(EVENT_LOOP_LAG_BUCKETS)
+
+
+async def monitor_event_loop_lag(interval: float = 0.01) -> None:
+    """
+    Records by how much the event loop overshoots sleeping for 'interval' seconds into EVENT_LOOP_LAG until cancelled.
+    Start it with: asyncio.create_task(metrics.monitor_event_loop_lag())
+    """
+    while True:
+        start = _perf_counter()
+        await _asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, _perf_counter() - start - interval))
@@ -0,0 +1,120 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+# Load driver running the generated raw services against a mock server (see server.py).
+# Run: python -m <package>.mock.load_driver [--server URL] [--concurrency N] [--requests N] [--endpoint FILTER] [--no-coalesce] [--parse-offload-threshold BYTES] [--parse-executor {thread,process}]
+
+import argparse as _argparse
+import asyncio as _asyncio
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from datetime import datetime as _datetime
+from time import perf_counter as _perf_counter
+from typing import Any as _Any
+from typing import Callable as _Callable
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Tuple as _Tuple
+
+from .. import metrics as _metrics
+from .. import pipeline as _pipeline
+from .. import singleflight as _singleflight
+{% for service in services %}
+from ..services.raw import {{service.name}}Raw as _{{service.name}}Raw
+{% endfor %}
+
+
+
+# ---------- Constants ----------
+
+ENDPOINT_CALLS: _List[_Tuple[str, _Callable, _Dict[str, _Any]]] = [
+{% for service in services %}
+{% for endpoint in service.endpoints %}
+{% if endpoint.return_type %}
+    ('{{service.name}}/{{endpoint.name}}', _{{service.name}}Raw.{{endpoint.name_snake_case}}, { {%- for parameter in endpoint.parameters %}'{{parameter.name_snake_case}}': {{parameter.sample_value}}{{ ', ' if not loop.last }}{% endfor -%} }),
+{% endif %}
+{% endfor %}
+{% endfor %}
+]
+
+
+
+# ---------- Load driver ----------
+
+def get_percentile(sorted_values: _List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(production_server: str, endpoint_calls: list, request_count: int, concurrency: int) -> _Tuple[_Dict[str, _List[float]], _Dict[str, int], int, float]:
+    latencies: _Dict[str, _List[float]] = {}
+    errors: _Dict[str, int] = {}
+    entity_count = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal entity_count, next_request
+        while next_request < request_count:
+            path, function, kwargs = endpoint_calls[next_request % len(endpoint_calls)]
+            next_request += 1
+            start = _perf_counter()
+            try:
+                result = await function(production_server, **kwargs)
+            except Exception:
+                errors[path] = errors.get(path, 0) + 1
+            else:
+                latencies.setdefault(path, []).append(_perf_counter() - start)
+                entity_count += len(result)
+
+    lag_monitor = _asyncio.create_task(_metrics.monitor_event_loop_lag())
+    start = _perf_counter()
+    await _asyncio.gather(*[worker() for _ in range(concurrency)])
+    duration = _perf_counter() - start
+    lag_monitor.cancel()
+    await _pipeline.close_session()
+    return latencies, errors, entity_count, duration
+
+
+def print_report(latencies: _Dict[str, _List[float]], errors: _Dict[str, int], entity_count: int, duration: float) -> None:
+    all_latencies = sorted(latency for path_latencies in latencies.values() for latency in path_latencies)
+    request_count = len(all_latencies)
+    error_count = sum(errors.values())
+    print(f'{request_count} requests ({error_count} errors) in {duration:.3f}s: {request_count / duration:.1f} requests/s, {entity_count / duration:.1f} entities/s')
+    print(f'Latency p50 {get_percentile(all_latencies, 50) * 1000:.2f} ms, p90 {get_percentile(all_latencies, 90) * 1000:.2f} ms, p99 {get_percentile(all_latencies, 99) * 1000:.2f} ms, max {get_percentile(all_latencies, 100) * 1000:.2f} ms')
+    event_loop_lag = _metrics.EVENT_LOOP_LAG.get_snapshot()
+    if event_loop_lag['count']:
+        print(f'Event loop lag p50 <= {event_loop_lag["p50"] * 1000:.2f} ms, p99 <= {event_loop_lag["p99"] * 1000:.2f} ms, max {event_loop_lag["max"] * 1000:.2f} ms')
+    print()
+    print(f'{"Endpoint":<60} {"Requests":>9} {"Errors":>7} {"p50 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+    for path in sorted(set(latencies.keys()).union(errors.keys())):
+        path_latencies = sorted(latencies.get(path, []))
+        print(f'{path:<60} {len(path_latencies):>9} {errors.get(path, 0):>7} {get_percentile(path_latencies, 50) * 1000:>9.2f} {get_percentile(path_latencies, 99) * 1000:>9.2f} {get_percentile(path_latencies, 100) * 1000:>9.2f}')
+
+
+
+# ---------- MAIN ----------
+
+if __name__ == '__main__':
+    parser = _argparse.ArgumentParser(description='Drive load against a mock PSS server using the generated raw services.')
+    parser.add_argument('--server', default='http://127.0.0.1:8080', help='Base URL of the mock server.')
+    parser.add_argument('--concurrency', type=int, default=32, help='Number of concurrent requests.')
+    parser.add_argument('--requests', type=int, default=1000, help='Total number of requests.')
+    parser.add_argument('--endpoint', default=None, help='Only call endpoints whose path contains this text.')
+    parser.add_argument('--no-coalesce', action='store_true', help='Disable coalescing of identical in-flight requests.')
+    parser.add_argument('--parse-offload-threshold', type=int, default=_pipeline.PARSE_OFFLOAD_THRESHOLD, help='Parse responses of at least this many bytes in the parse executor. 0 offloads all, -1 none.')
+    parser.add_argument('--parse-executor', choices=('thread', 'process'), default='thread', help='Kind of parse executor.')
+    args = parser.parse_args()
+
+    endpoint_calls = [endpoint_call for endpoint_call in ENDPOINT_CALLS if not args.endpoint or args.endpoint in endpoint_call[0]]
+    if not endpoint_calls:
+        raise ValueError(f'No endpoint matches: {args.endpoint}')
+    _singleflight.REQUESTS.enabled = not args.no_coalesce
+    parse_executor = _ProcessPoolExecutor() if args.parse_executor == 'process' else None
+    _pipeline.set_parse_executor(parse_executor, None if args.parse_offload_threshold < 0 else args.parse_offload_threshold)
+
+    results = _asyncio.run(run_load(args.server, endpoint_calls, args.requests, args.concurrency))
+    print_report(*results)
+    print()
+    print(f'Coalescing: {_singleflight.REQUESTS.get_stats()}')
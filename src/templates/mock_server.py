@@ -0,0 +1,184 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+# Local mock PSS server synthesizing type-correct XML responses from the parsed API schema.
+# Run: python -m <package>.mock.server [--host HOST] [--port PORT] [--entities N] [--nested-entities N] [--latency SECONDS] [--jitter SECONDS] [--seed SEED]
+
+import argparse as _argparse
+import asyncio as _asyncio
+from datetime import datetime as _datetime
+from datetime import timedelta as _timedelta
+import json as _json
+import os as _os
+import random as _random
+import string as _string
+from typing import Dict as _Dict
+from typing import Optional as _Optional
+from xml.etree import ElementTree as _ElementTree
+
+
+
+# ---------- Constants ----------
+
+SCHEMA_FILE_PATH: str = _os.path.join(_os.path.dirname(__file__), 'schema.json')
+DATETIME_FORMAT: str = '%Y-%m-%dT%H:%M:%S'
+BASE_DATETIME: _datetime = _datetime(2016, 1, 6)
+
+
+
+# ---------- Response synthesis ----------
+
+class ResponseFactory():
+    def __init__(self, schema: dict, entity_count: int, nested_entity_count: int = 3, seed: int = 0) -> None:
+        self.__endpoints: _Dict[str, dict] = schema['endpoints']
+        self.__entities: _Dict[str, _Dict[str, str]] = schema['entities']
+        self.__entity_count: int = entity_count
+        self.__nested_entity_count: int = nested_entity_count
+        self.__random: _random.Random = _random.Random(seed)
+        self.__responses: _Dict[str, bytes] = {}
+
+    @property
+    def paths(self) -> list:
+        return sorted(self.__endpoints.keys())
+
+
+    def get_response(self, path: str) -> _Optional[bytes]:
+        """Returns the synthesized response body for the path or None, if the endpoint is unknown. Bodies are built once per path."""
+        result = self.__responses.get(path)
+        if result is None and path in self.__endpoints:
+            response_structure = self.__endpoints[path]['response_structure']
+            if response_structure:
+                tag, structure = next(iter(response_structure.items()))
+                root = self.__create_element(tag, structure)
+                result = _ElementTree.tostring(root, encoding='utf-8')
+            else:
+                result = b''
+            self.__responses[path] = result
+        return result
+
+
+    def __create_element(self, tag: str, structure: dict, index: int = 0, is_nested: bool = False) -> _ElementTree.Element:
+        properties = structure.get('properties') or self.__entities.get(tag) or {}
+        result = _ElementTree.Element(tag, {name: self.__create_value(name, type_, index) for name, type_ in properties.items()})
+        # Entity lists within entities (e.g. the parts of a character design) are kept short
+        is_nested = is_nested or tag in self.__entities
+        for child_tag, child_structure in structure.items():
+            if child_tag == 'properties' or not isinstance(child_structure, dict):
+                continue
+            if child_tag in self.__entities:
+                for child_index in range(self.__nested_entity_count if is_nested else self.__entity_count):
+                    result.append(self.__create_element(child_tag, child_structure, child_index, is_nested))
+            else:
+                result.append(self.__create_element(child_tag, child_structure, is_nested=is_nested))
+        return result
+
+
+    def __create_value(self, name: str, type_: str, index: int) -> str:
+        if name == 'version':
+            return '1'
+        if type_ == 'int':
+            if name.endswith('Id'):
+                return str(index + 1)
+            return str(self.__random.randint(0, 10000))
+        if type_ == 'float':
+            return f'{self.__random.uniform(0, 1000):.3f}'
+        if type_ == 'bool':
+            return self.__random.choice(('True', 'False'))
+        if type_ == 'datetime':
+            return (BASE_DATETIME + _timedelta(seconds=self.__random.randint(0, 200000000))).strftime(DATETIME_FORMAT)
+        return ''.join(self.__random.choices(_string.ascii_letters, k=self.__random.randint(4, 16)))
+
+
+
+# ---------- HTTP server ----------
+
+class MockServer():
+    def __init__(self, response_factory: ResponseFactory, latency: float = 0.0, jitter: float = 0.0) -> None:
+        self.__jitter: float = jitter
+        self.__latency: float = latency
+        self.__request_count: int = 0
+        self.__response_factory: ResponseFactory = response_factory
+
+    @property
+    def request_count(self) -> int:
+        return self.__request_count
+
+
+    async def handle_connection(self, reader: _asyncio.StreamReader, writer: _asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                _, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                content_length = int(headers.get('content-length') or 0)
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                self.__request_count += 1
+                body = self.__response_factory.get_response(target.split('?', 1)[0].strip('/'))
+                if self.__latency or self.__jitter:
+                    await _asyncio.sleep(self.__latency + _random.uniform(0, self.__jitter))
+
+                status = '200 OK' if body is not None else '404 Not Found'
+                body = body or b''
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write((
+                    f'HTTP/1.1 {status}\r\n'
+                    'Content-Type: application/xml; charset=utf-8\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+                    '\r\n'
+                ).encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, _asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await _asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+
+def read_schema(file_path: str = SCHEMA_FILE_PATH) -> dict:
+    with open(file_path) as fp:
+        result = _json.load(fp)
+    return result
+
+
+
+# ---------- MAIN ----------
+
+if __name__ == '__main__':
+    parser = _argparse.ArgumentParser(description='Serve synthesized PSS API responses.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--entities', type=int, default=100, help='Number of entities per returned list.')
+    parser.add_argument('--nested-entities', type=int, default=3, help='Number of entities per list nested within an entity.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixed latency per response in seconds.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum random latency added per response in seconds.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    response_factory = ResponseFactory(read_schema(), args.entities, nested_entity_count=args.nested_entities, seed=args.seed)
+    for path in response_factory.paths:
+        response_factory.get_response(path)
+    print(f'Serving {len(response_factory.paths)} mock endpoints with {args.entities} entities per list at: http://{args.host}:{args.port}', flush=True)
+    try:
+        _asyncio.run(MockServer(response_factory, latency=args.latency, jitter=args.jitter).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
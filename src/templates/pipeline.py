@@ -0,0 +1,135 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+import asyncio as _asyncio
+from concurrent.futures import Executor as _Executor
+from datetime import datetime as _datetime
+from time import perf_counter as _perf_counter
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Type as _Type
+from xml.etree import ElementTree as _ElementTree
+
+import aiohttp as _aiohttp
+
+from . import metrics as _metrics
+
+
+
+# ---------- Constants ----------
+
+DATETIME_FORMAT: str = '%Y-%m-%dT%H:%M:%S'
+
+# Responses of at least this many bytes will be parsed in the parse executor instead of on the event loop. None disables offloading.
+PARSE_OFFLOAD_THRESHOLD: _Optional[int] = 256 * 1024
+
+# Thread or process pool executor for parsing large responses. None uses the event loop's default (thread pool) executor.
+_parse_executor: _Optional[_Executor] = None
+
+# Shared by all requests, so that connections get reused. Created per event loop, unless set via set_session().
+_session: _Optional[_aiohttp.ClientSession] = None
+_session_loop: _Optional[_asyncio.AbstractEventLoop] = None
+_session_is_external: bool = False
+
+
+
+# ---------- Functions ----------
+
+async def close_session() -> None:
+    """
+    Closes the shared session. Sessions set via set_session() have to be closed by their owner.
+    """
+    global _session, _session_loop
+    if _session is None or _session_is_external:
+        return
+    await _session.close()
+    _session = None
+    _session_loop = None
+
+
+async def get_data_from_path(production_server: str, path: str, **params) -> bytes:
+    if '://' in production_server:
+        # Allows for other schemes, e.g. to run against a local mock server
+        url = f'{production_server}/{path}'
+    else:
+        url = f'https://{production_server}/{path}'
+    query_params = {name: _convert_param_value(value) for name, value in params.items() if value is not None}
+    async with get_session().get(url, params=query_params) as response:
+        response.raise_for_status()
+        result = await response.read()
+    return result
+
+
+async def get_entities_from_path(entity_type: _Type, xml_parent_tag_name: str, endpoint_metrics: _metrics.EndpointMetrics, production_server: str, path: str, **params) -> _List[_Any]:
+    if not _metrics.ENABLED:
+        data = await get_data_from_path(production_server, path, **params)
+        return await parse_entities_async(entity_type, xml_parent_tag_name, data)
+
+    start = _perf_counter()
+    data = await get_data_from_path(production_server, path, **params)
+    parse_start = _perf_counter()
+    result = await parse_entities_async(entity_type, xml_parent_tag_name, data)
+    end = _perf_counter()
+    endpoint_metrics.record(parse_start - start, len(data), end - parse_start, len(result))
+    return result
+
+
+def get_session() -> _aiohttp.ClientSession:
+    """
+    Returns the session set via set_session() or one shared by all requests on the running event loop.
+    """
+    global _session, _session_loop
+    if _session_is_external:
+        return _session
+    loop = _asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = _aiohttp.ClientSession()
+        _session_loop = loop
+    return _session
+
+
+def parse_entities(entity_type: _Type, xml_parent_tag_name: str, data: bytes) -> _List[_Any]:
+    root = _ElementTree.fromstring(data)
+    parent = root if root.tag == xml_parent_tag_name else root.find(f'.//{xml_parent_tag_name}')
+    if parent is None:
+        return []
+    return [entity_type(child.attrib) for child in parent]
+
+
+async def parse_entities_async(entity_type: _Type, xml_parent_tag_name: str, data: bytes) -> _List[_Any]:
+    """
+    Parses small responses inline and hands large ones to the parse executor, so that they don't block the event loop.
+    With a process pool executor, entity_type must be importable by the worker processes.
+    """
+    if PARSE_OFFLOAD_THRESHOLD is None or len(data) < PARSE_OFFLOAD_THRESHOLD:
+        return parse_entities(entity_type, xml_parent_tag_name, data)
+    loop = _asyncio.get_running_loop()
+    result = await loop.run_in_executor(_parse_executor, parse_entities, entity_type, xml_parent_tag_name, data)
+    return result
+
+
+def set_parse_executor(executor: _Optional[_Executor], threshold: _Optional[int] = PARSE_OFFLOAD_THRESHOLD) -> None:
+    global _parse_executor, PARSE_OFFLOAD_THRESHOLD
+    _parse_executor = executor
+    PARSE_OFFLOAD_THRESHOLD = threshold
+
+
+def set_session(session: _Optional[_aiohttp.ClientSession]) -> None:
+    """
+    Uses the specified session for all requests, e.g. one with custom connection limits or timeouts. None reverts to the shared session.
+    """
+    global _session, _session_loop, _session_is_external
+    _session = session
+    _session_loop = None
+    _session_is_external = session is not None
+
+
+def _convert_param_value(value: _Any) -> str:
+    if isinstance(value, _datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
@@ -6,7 +6,9 @@
 {{service_import}}
 {% endfor %}
 
-from ... import core as _core
+from ... import metrics as _metrics
+from ... import pipeline as _pipeline
+from ... import singleflight as _singleflight
 {% for entity_type in service.entity_types %}
 from ...entities import {{entity_type}} as _{{entity_type}}
 {% endfor %}
@@ -20,6 +22,13 @@ from ...entities import {{entity_type}} as _{{entity_type}}
 {% endfor %}
 
 
+# ---------- Metrics ----------
+
+{% for endpoint in service.endpoints %}
+{{endpoint.base_path_name}}_METRICS: _metrics.EndpointMetrics = _metrics.register_endpoint({{endpoint.base_path_name}}_BASE_PATH)
+{% endfor %}
+
+
 # ---------- Endpoints ----------
 
 {% for endpoint in service.endpoints %}
@@ -29,7 +38,10 @@ async def {{endpoint.name_snake_case}}(production_server: str, {{endpoint.parame
         '{{parameter.name}}': {{parameter.name_snake_case}},
 {% endfor %}
     }
-    result = await _core.get_entities_from_path(_{{endpoint.return_type}}, '{{endpoint.xml_parent_tag_name}}', production_server, {{endpoint.base_path_name}}_BASE_PATH, **params)
+    result = await _singleflight.REQUESTS.do(
+        _singleflight.get_request_key(production_server, {{endpoint.base_path_name}}_BASE_PATH, params),
+        lambda: _pipeline.get_entities_from_path(_{{endpoint.return_type}}, '{{endpoint.xml_parent_tag_name}}', {{endpoint.base_path_name}}_METRICS, production_server, {{endpoint.base_path_name}}_BASE_PATH, **params)
+    )
     return result
 
 
@@ -0,0 +1,91 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+import asyncio as _asyncio
+from typing import Any as _Any
+from typing import Awaitable as _Awaitable
+from typing import Callable as _Callable
+from typing import Dict as _Dict
+from typing import Hashable as _Hashable
+
+
+
+class SingleFlight():
+    """
+    Coalesces identical in-flight requests: while a call for a key is running, further calls for
+    the same key wait for that call's result instead of starting their own.
+    """
+    def __init__(self) -> None:
+        self.enabled: bool = True
+        self.__coalesced_count: int = 0
+        self.__executed_count: int = 0
+        self.__in_flight: _Dict[_Hashable, _asyncio.Future] = {}
+
+    @property
+    def coalesced_count(self) -> int:
+        """Number of calls that have been served by another call's result."""
+        return self.__coalesced_count
+
+    @property
+    def executed_count(self) -> int:
+        """Number of calls that have actually been executed."""
+        return self.__executed_count
+
+    @property
+    def in_flight_count(self) -> int:
+        return len(self.__in_flight)
+
+
+    async def do(self, key: _Hashable, func: _Callable[[], _Awaitable[_Any]]) -> _Any:
+        if not self.enabled:
+            self.__executed_count += 1
+            return await func()
+
+        task = self.__in_flight.get(key)
+        if task is None:
+            task = _asyncio.ensure_future(func())
+            self.__in_flight[key] = task
+            task.add_done_callback(lambda done_task: self.__remove(key, done_task))
+            self.__executed_count += 1
+            # Shielded, so that a cancelled caller doesn't cancel the call for the other waiters
+            return await _asyncio.shield(task)
+
+        self.__coalesced_count += 1
+        result = await _asyncio.shield(task)
+        if isinstance(result, list):
+            # Every waiter gets its own list, so that modifying it won't affect the other waiters
+            result = list(result)
+        return result
+
+
+    def get_stats(self) -> _Dict[str, int]:
+        return {
+            'coalesced': self.coalesced_count,
+            'executed': self.executed_count,
+            'in_flight': self.in_flight_count,
+        }
+
+
+    def reset_stats(self) -> None:
+        self.__coalesced_count = 0
+        self.__executed_count = 0
+
+
+    def __remove(self, key: _Hashable, task: _asyncio.Future) -> None:
+        if self.__in_flight.get(key) is task:
+            del self.__in_flight[key]
+        if not task.cancelled():
+            # Mark a possible exception as retrieved, in case all waiters have been cancelled
+            task.exception()
+
+
+
+
+
+REQUESTS: SingleFlight = SingleFlight()
+
+
+
+def get_request_key(production_server: str, path: str, params: _Dict[str, _Any]) -> _Hashable:
+    return (production_server, path, tuple(sorted((name, str(value)) for name, value in params.items())))
@@ -0,0 +1,163 @@
+####################################################
+##   This file has been generated automatically   ##
+####################################################
+
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import Iterable as _Iterable
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Type as _Type
+from typing import TypeVar as _TypeVar
+from xml.etree import ElementTree as _ElementTree
+
+try:
+    import numpy as _np
+except ImportError as e:
+    raise ImportError('The table classes require numpy. Install it with: pip install numpy') from e
+
+from ..types import EntityInfo as _EntityInfo
+
+
+
+# ---------- Constants ----------
+
+TableType = _TypeVar('TableType', bound='TableBase')
+
+
+
+# ---------- Classes ----------
+
+class TableBase():
+    """
+    Columnar storage for many entities of the same type: one numpy array per property.
+    Missing values are stored as 0 (int), NaN (float), False (bool), NaT (datetime) and None (str).
+    Columns containing values that don't match the inferred type fall back to float (int) or to the raw strings.
+    """
+    COLUMN_TYPES: _Dict[str, str] = {}
+    ENTITY_RAW_TYPE: type = None
+    XML_NODE_NAME: str = None
+    XML_PROPERTY_NAMES: _Dict[str, str] = {}
+
+    def __init__(self, columns: _Dict[str, _np.ndarray]) -> None:
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('All columns must have the same length.')
+        self.__columns: _Dict[str, _np.ndarray] = columns
+        self.__length: int = lengths.pop() if lengths else 0
+
+    @property
+    def column_names(self) -> _List[str]:
+        return list(self.__columns.keys())
+
+    @property
+    def column_data(self) -> _Dict[str, _np.ndarray]:
+        return dict(self.__columns)
+
+
+    def __getitem__(self, column_name: str) -> _np.ndarray:
+        return self.__columns[column_name]
+
+
+    def __len__(self) -> int:
+        return self.__length
+
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} {self.__length} rows: {", ".join(self.column_names)}>'
+
+
+    @classmethod
+    def from_entities(cls: _Type[TableType], entities: _Iterable[_Any]) -> TableType:
+        """Creates a table from entity objects by reading their properties through the raw entity type, as entity classes may override e.g. 'id'."""
+        entities = list(entities)
+        columns = {}
+        for column_name, column_type in cls.COLUMN_TYPES.items():
+            get_value = getattr(cls.ENTITY_RAW_TYPE, column_name).fget
+            columns[column_name] = _create_column([get_value(entity) for entity in entities], column_type, converted=True)
+        return cls(columns)
+
+
+    @classmethod
+    def from_entity_infos(cls: _Type[TableType], entity_infos: _Iterable[_EntityInfo]) -> TableType:
+        """Creates a table directly from the XML attributes of entities, without creating entity objects."""
+        entity_infos = list(entity_infos)
+        columns = {
+            column_name: _create_column([entity_info.get(cls.XML_PROPERTY_NAMES[column_name]) for entity_info in entity_infos], column_type)
+            for column_name, column_type in cls.COLUMN_TYPES.items()
+        }
+        return cls(columns)
+
+
+    @classmethod
+    def from_xml(cls: _Type[TableType], data: bytes) -> TableType:
+        """Creates a table from all elements named XML_NODE_NAME in an XML response."""
+        root = _ElementTree.fromstring(data)
+        return cls.from_entity_infos(element.attrib for element in root.iter(cls.XML_NODE_NAME))
+
+
+    def filter(self: TableType, mask: _np.ndarray) -> TableType:
+        """Returns a new table containing the rows, for which mask is True. E.g.: table.filter(table['price'] > 100)"""
+        return type(self)({column_name: column[mask] for column_name, column in self.__columns.items()})
+
+
+    def head(self: TableType, count: int) -> TableType:
+        return type(self)({column_name: column[:count] for column_name, column in self.__columns.items()})
+
+
+    def select(self: TableType, *column_names: str) -> TableType:
+        """Returns a new table containing only the specified columns."""
+        return type(self)({column_name: self.__columns[column_name] for column_name in column_names})
+
+
+    def sort(self: TableType, column_name: str, descending: bool = False) -> TableType:
+        """Returns a new table sorted stably by the specified column. Missing values come last, or first, if descending."""
+        sort_column = self.__columns[column_name]
+        if sort_column.dtype == object:
+            order = _np.array(sorted(range(len(sort_column)), key=lambda index: (sort_column[index] is None, sort_column[index]), reverse=descending), dtype=_np.intp)
+        elif descending:
+            # Sort the reversed column and map back, so that rows with equal values keep their order
+            order = len(sort_column) - 1 - _np.argsort(sort_column[::-1], kind='stable')[::-1]
+        else:
+            order = _np.argsort(sort_column, kind='stable')
+        return type(self)({name: column[order] for name, column in self.__columns.items()})
+
+
+    def to_dicts(self) -> _List[_Dict[str, _Any]]:
+        column_names = self.column_names
+        return [dict(zip(column_names, row)) for row in zip(*(self.__columns[column_name].tolist() for column_name in column_names))]
+
+
+
+# ---------- Helper ----------
+
+def _create_column(values: _List[_Optional[_Any]], column_type: str, converted: bool = False) -> _np.ndarray:
+    # Column types are inferred from samples, so later rows may contain e.g. '1.5' in an int column
+    try:
+        return _create_typed_column(values, column_type, converted)
+    except (TypeError, ValueError):
+        if column_type == 'int':
+            return _create_column(values, 'float', converted)
+        return _create_object_column(values)
+
+
+def _create_object_column(values: _List[_Optional[_Any]]) -> _np.ndarray:
+    result = _np.empty(len(values), dtype=object)
+    result[:] = values
+    return result
+
+
+def _create_typed_column(values: _List[_Optional[_Any]], column_type: str, converted: bool = False) -> _np.ndarray:
+    if column_type == 'int':
+        return _np.fromiter((int(value) if value not in (None, '') else 0 for value in values), dtype=_np.int64, count=len(values))
+    if column_type == 'float':
+        return _np.fromiter((float(value) if value not in (None, '') else _np.nan for value in values), dtype=_np.float64, count=len(values))
+    if column_type == 'bool':
+        if converted:
+            return _np.fromiter((bool(value) for value in values), dtype=_np.bool_, count=len(values))
+        return _np.fromiter((value is not None and value.lower() == 'true' for value in values), dtype=_np.bool_, count=len(values))
+    if column_type == 'datetime':
+        if converted:
+            return _np.array([value if value is not None else 'NaT' for value in values], dtype='datetime64[s]')
+        return _np.array([value or 'NaT' for value in values], dtype='datetime64[s]')
+    return _create_object_column(values)
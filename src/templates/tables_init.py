@@ -0,0 +1,4 @@
+from .table_base import TableBase
+{% for entity in entities %}
+from .{{entity.name_snake_case}}_table import {{entity.name}}Table
+{% endfor %}
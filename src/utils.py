@@ -1,5 +1,18 @@
+import hashlib as _hashlib
+import json as _json
+import marshal as _marshal
 import os as _os
 import re as _re
+import struct as _struct
+import tempfile as _tempfile
+from typing import Any as _Any
+
+
+
+# Bump, whenever the layout of cache files changes
+JSON_CACHE_FORMAT_VERSION: int = 1
+JSON_CACHE_FILE_EXTENSION: str = '.cache'
+JSON_CACHE_MAGIC: bytes = b'PSSJSONC'
 
 
 
@@ -18,4 +31,66 @@ def create_path(path: str) -> None:
 def create_file(path: str, contents: str, overwrite: bool = False) -> None:
     if overwrite or not _os.path.exists(path):
         with open(path, 'w') as fp:
-            fp.write(contents or '')
\ No newline at end of file
+            fp.write(contents or '')
+
+
+def get_json_cache_path(file_path: str) -> str:
+    return f'{file_path}{JSON_CACHE_FILE_EXTENSION}'
+
+
+def read_json(file_path: str, use_cache: bool = True) -> _Any:
+    """
+    Reads a JSON file. If use_cache is True, the decoded data will be stored in a marshal file next to the JSON file
+    and read from there instead, as long as the JSON file's contents don't change. The cache is keyed by the cache
+    format version, the marshal format version and the SHA-256 hash of the JSON file. Unlike pickle, marshal only
+    creates plain data objects when loading, so a tampered cache file cannot execute code.
+    """
+    with open(file_path, 'rb') as fp:
+        contents = fp.read()
+    if not use_cache:
+        return _json.loads(contents)
+
+    cache_header = _get_json_cache_header(contents)
+    cache_path = get_json_cache_path(file_path)
+    result = _read_json_cache(cache_path, cache_header)
+    if result is None:
+        result = _json.loads(contents)
+        _store_json_cache(cache_path, cache_header, result)
+    return result
+
+
+def _get_json_cache_header(contents: bytes) -> bytes:
+    return JSON_CACHE_MAGIC + _struct.pack('<HH', JSON_CACHE_FORMAT_VERSION, _marshal.version) + _hashlib.sha256(contents).digest()
+
+
+def _read_json_cache(cache_path: str, cache_header: bytes) -> _Any:
+    try:
+        with open(cache_path, 'rb') as fp:
+            # The header gets checked before reading the rest of the file, so that stale data doesn't need to be loaded.
+            if fp.read(len(cache_header)) != cache_header:
+                return None
+            result = _marshal.loads(fp.read())
+    except (OSError, EOFError, TypeError, ValueError):
+        return None
+    # JSON files decode to a dict or a list at the top level. Anything else means that the cache file is not ours.
+    if not isinstance(result, (dict, list)):
+        return None
+    return result
+
+
+def _store_json_cache(cache_path: str, cache_header: bytes, data: _Any) -> None:
+    # Write to a temporary file first and replace the cache file, so that concurrent readers never see a partially written cache.
+    try:
+        fd, temp_path = _tempfile.mkstemp(dir=_os.path.dirname(_os.path.abspath(cache_path)), suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with _os.fdopen(fd, 'wb') as fp:
+            fp.write(cache_header)
+            fp.write(_marshal.dumps(data))
+        _os.replace(temp_path, cache_path)
+    except (OSError, ValueError):
+        try:
+            _os.remove(temp_path)
+        except OSError:
+            pass